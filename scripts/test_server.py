@@ -21,8 +21,7 @@ def run(send, incoming):
     loop = asyncio.get_event_loop()
     stop = asyncio.Future()
 
-    @asyncio.coroutine
-    def server(stop):
+    async def server(stop):
         """
         Arguments
         ---------
@@ -32,8 +31,7 @@ def run(send, incoming):
         server runs on.
         """
 
-        @asyncio.coroutine
-        def handler(websocket, path):
+        async def handler(websocket, path=None):
             """
             Forwards all elements in the queue directly into the
             websocket.
@@ -41,12 +39,12 @@ def run(send, incoming):
             logging.debug('New connection on path %s', path)
             for elm in send:
                 logging.debug('Send element: %s', elm)
-                yield from websocket.send(elm)
+                await websocket.send(elm)
 
             try:
                 while True:
                     logging.debug("Wait for messages.")
-                    elm = yield from websocket.recv()
+                    elm = await websocket.recv()
                     logging.debug("Received element.")
                     incoming.remove(elm)
                     logging.debug("Removed element.")
@@ -63,17 +61,17 @@ def run(send, incoming):
 
         try:
             logging.debug("Starting websocket server.")
-            server_handle = yield from websockets.serve(
+            server_handle = await websockets.serve(
                 handler, host='127.0.0.1', port=8750)
         except Exception as err:  #pylint: disable=W0703
             logging.debug(err)
             sys.exit(1)
 
-        yield from stop
+        await stop
 
         logging.debug("Received SIGTERM ... closing server.")
         server_handle.close()
-        yield from server_handle.wait_closed()
+        await server_handle.wait_closed()
 
     loop.run_until_complete(server(stop))
 
@@ -38,11 +38,12 @@ setup(
     author="bp-flugsimulator",
     license="MIT",
     install_requires=INSTALL_REQUIRES,
-    python_requires=">=3.4",
+    python_requires=">=3.5",
     packages=find_packages(
         exclude=["*.tests", "*.tests.*", "tests.*", "tests"]),
     extras_require={
         "websockets": WEBSOCKETS_REQUIRES,
+        "uvloop": ["uvloop"],
     },
     test_suite="tests",
     data_files=[("", [
@@ -14,7 +14,11 @@ import unittest
 
 import websockets
 
-from utils import Command, Rpc, RpcReceiver, Status
+from utils import Command, Rpc, RpcMethod, RpcNamespace, RpcReceiver, Status
+from utils.envelope import pack_envelope, unpack_envelope
+from utils.rpc_extra.rpc_websockets import (Truncated, _PipeClosed,
+                                            _PipeSession, install_uvloop,
+                                            uvloop)
 
 # is on both platforms available
 
@@ -29,9 +33,10 @@ class Server:
     should be received.
     """
 
-    def __init__(self, send, output):
+    def __init__(self, send, output, **kwargs):
         self.send = send
         self.output = output
+        self.kwargs = kwargs
 
     def run(self):
         """
@@ -61,7 +66,6 @@ class Server:
             stdout=asyncio.subprocess.PIPE,
             stdin=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            loop=loop,
         )
 
         logging.debug("Start child process.")
@@ -82,14 +86,14 @@ class Server:
 
         recv = RpcReceiver(
             'ws://127.0.0.1:8750/commands',
+            **self.kwargs
         )
 
-        @asyncio.coroutine
-        def wait_for_end():
+        async def wait_for_end():
             """
             Wrapper for event loop.
             """
-            finished, pending = yield from asyncio.wait(
+            finished, pending = await asyncio.wait(
                 [
                     asyncio.ensure_future(recv.run()),
                     asyncio.ensure_future(process.wait()),
@@ -119,8 +123,9 @@ class Server:
         logging.debug("Running main loop.")
         loop.run_until_complete(wait_for_end())
         recv.close()
-        logging.debug("Send SIGTERM to child process.")
-        process.terminate()
+        if process.returncode is None:
+            logging.debug("Send SIGTERM to child process.")
+            process.terminate()
         logging.debug("Wait for process to close.")
         loop.run_until_complete(process.wait())
 
@@ -170,7 +175,6 @@ class CloseFailServer(Server):
             stdout=asyncio.subprocess.PIPE,
             stdin=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            loop=loop,
         )
 
         logging.debug("Start child process.")
@@ -195,22 +199,24 @@ class CloseFailServer(Server):
 
         logging.debug("Ensuring future run")
 
-        @asyncio.coroutine
-        def rcv_run_wrapper():
+        async def rcv_run_wrapper():
             """
             Coroutine to capture the ConnectionClosed Exception.
             """
             try:
-                yield from recv.run()
+                await recv.run()
             except websockets.exceptions.ConnectionClosed:
                 logging.debug('catched ConnectionClosed Exception as excepted.')
 
-        @asyncio.coroutine
-        def wait_for_end():
+        async def wait_for_end():
             """
             Coroutine to trigger execution of rcv_run_wrapper() and process.wait()
             """
-            yield from asyncio.wait([rcv_run_wrapper(), process.wait(), asyncio.sleep(0.1)])
+            await asyncio.wait([
+                asyncio.ensure_future(rcv_run_wrapper()),
+                asyncio.ensure_future(process.wait()),
+                asyncio.ensure_future(asyncio.sleep(0.1)),
+            ])
 
         loop.run_until_complete(wait_for_end())
         logging.debug("Closing Receiver")
@@ -218,8 +224,20 @@ class CloseFailServer(Server):
         loop.run_until_complete(process.wait())
 
 
-@asyncio.coroutine
-def forward_stream_to(source, destination):
+def math_mul(integer1, integer2):
+    """
+    Simple mul function. Has to be on module level, otherwise it can not be
+    executed in a process pool.
+
+    Arguments
+    ---------
+        integer1: first operand
+        integer2: second operand
+    """
+    return integer1 * integer2
+
+
+async def forward_stream_to(source, destination):
     """
     Forwards all lines from the source to
     the destination.
@@ -235,7 +253,7 @@ def forward_stream_to(source, destination):
     """
     while True:
         try:
-            line = yield from source.readline()
+            line = await source.readline()
             if not line:
                 break
             destination.write(line.decode())
@@ -245,6 +263,60 @@ def forward_stream_to(source, destination):
     return None
 
 
+async def serve(handler):
+    """
+    Starts a websocket server in this process. Newer versions of websockets
+    need a running event loop for this.
+
+    Arguments
+    ---------
+        handler: @coroutine which handles a connection
+
+    Returns
+    -------
+        server
+    """
+    return await websockets.serve(handler, host='127.0.0.1', port=8751)
+
+
+class TestTruncated(unittest.TestCase):
+    """
+    Testcases for the Truncated class.
+    """
+
+    def test_short(self):
+        """
+        Tests if short texts are not changed.
+        """
+        self.assertEqual(str(Truncated([1, 2], 10)), "[1, 2]")
+        self.assertEqual(str(Truncated("a" * 20, None)), "a" * 20)
+
+    def test_long(self):
+        """
+        Tests if long texts are cut.
+        """
+        self.assertEqual(
+            str(Truncated("a" * 20, 5)), "aaaaa... (20 characters)")
+
+
+class TestInstallUvloop(unittest.TestCase):
+    """
+    Testcases for install_uvloop.
+    """
+
+    def test_install_uvloop(self):
+        """
+        Tests if the uvloop policy is only set if uvloop is installed.
+        """
+        policy = asyncio.get_event_loop_policy()
+        try:
+            self.assertEqual(install_uvloop(), uvloop is not None)
+            if uvloop is None:
+                self.assertIs(asyncio.get_event_loop_policy(), policy)
+        finally:
+            asyncio.set_event_loop_policy(policy)
+
+
 class TestRpcReceiver(unittest.TestCase):
     """
     Testcases for the RpcReceiver class.
@@ -281,8 +353,7 @@ class TestRpcReceiver(unittest.TestCase):
         """
 
         @Rpc.method
-        @asyncio.coroutine
-        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+        async def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
             """
             Simple add function with async.
 
@@ -291,7 +362,7 @@ class TestRpcReceiver(unittest.TestCase):
                 integer1: first operand
                 integer2: second operand
             """
-            yield from asyncio.sleep(1)
+            await asyncio.sleep(1)
             res = (integer1 + integer2)
             return res
 
@@ -339,6 +410,896 @@ class TestRpcReceiver(unittest.TestCase):
             ],
         ).run()
 
+    def test_math_add_namespace(self):  # pylint: disable=R0201
+        """
+        Testing simple math add function in a separate namespace.
+        """
+        namespace = RpcNamespace()
+
+        @namespace.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+
+            Arguments
+            ---------
+                integer1: first operand
+                integer2: second operand
+            """
+            return integer1 + integer2
+
+        cmd = Command("math_add", integer1=1, integer2=2)
+        status = Status.ok({'method': 'math_add', 'result': 3})
+        status.uuid = cmd.uuid
+
+        Server(
+            [
+                cmd.to_json(),
+            ],
+            [
+                status.to_json(),
+            ],
+            rpc=namespace,
+        ).run()
+
+    def test_math_add_thread(self):  # pylint: disable=R0201
+        """
+        Testing simple math add function which is executed in a thread pool.
+        """
+
+        @Rpc.method(execution=RpcMethod.EXECUTION_THREAD)
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+
+            Arguments
+            ---------
+                integer1: first operand
+                integer2: second operand
+            """
+            return integer1 + integer2
+
+        cmd = Command("math_add", integer1=1, integer2=2)
+        status = Status.ok({'method': 'math_add', 'result': 3})
+        status.uuid = cmd.uuid
+
+        Server(
+            [
+                cmd.to_json(),
+            ],
+            [
+                status.to_json(),
+            ],
+            thread_pool_size=1,
+        ).run()
+
+    def test_math_mul_process(self):  # pylint: disable=R0201
+        """
+        Testing simple math mul function which is executed in a process pool.
+        """
+        namespace = RpcNamespace()
+        namespace.method(math_mul, execution=RpcMethod.EXECUTION_PROCESS)
+
+        cmd = Command("math_mul", integer1=2, integer2=3)
+        status = Status.ok({'method': 'math_mul', 'result': 6})
+        status.uuid = cmd.uuid
+
+        Server(
+            [
+                cmd.to_json(),
+            ],
+            [
+                status.to_json(),
+            ],
+            rpc=namespace,
+            process_pool_size=1,
+        ).run()
+
+    def test_limit_method(self):  # pylint: disable=R0201
+        """
+        Tests if all commands are executed if a method has an in-flight limit.
+        """
+
+        @Rpc.method(max_in_flight=1)
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function, that sleeps.
+            """
+            await asyncio.sleep(sec)
+            return sec
+
+        cmds = [Command('sleep', sec=0.1) for _ in range(3)]
+        statuses = [
+            Status(Status.ID_OK, {
+                'method': 'sleep',
+                'result': 0.1
+            }, cmd.uuid) for cmd in cmds
+        ]
+
+        Server(
+            [cmd.to_json() for cmd in cmds],
+            [status.to_json() for status in statuses],
+            max_pending=2,
+        ).run()
+
+    def test_limit_global(self):  # pylint: disable=R0201
+        """
+        Tests if all commands are executed if the receiver has an in-flight
+        limit and no pending queue.
+        """
+
+        @Rpc.method
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function, that sleeps.
+            """
+            await asyncio.sleep(sec)
+            return sec
+
+        cmds = [Command('sleep', sec=0.1) for _ in range(3)]
+        statuses = [
+            Status(Status.ID_OK, {
+                'method': 'sleep',
+                'result': 0.1
+            }, cmd.uuid) for cmd in cmds
+        ]
+
+        Server(
+            [cmd.to_json() for cmd in cmds],
+            [status.to_json() for status in statuses],
+            max_in_flight=1,
+        ).run()
+
+    def test_limit_queue_order(self):
+        """
+        Tests if queued commands start in order of arrival once the limit
+        which blocks them allows it.
+        """
+        calls = []
+
+        @Rpc.method(max_in_flight=1)
+        async def slow(name):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function with a method limit.
+            """
+            calls.append(name)
+            await asyncio.sleep(0.05)
+            return name
+
+        @Rpc.method
+        async def fast(name):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function without a method limit.
+            """
+            calls.append(name)
+            return name
+
+        cmds = [
+            Command("slow", name="a"),
+            Command("slow", name="b"),
+            Command("fast", name="c"),
+            Command("slow", name="d"),
+            Command("fast", name="e"),
+        ]
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Sends all commands in one batch and collects the results.
+            """
+            await websocket.send(Command.to_json_batch(cmds))
+            results = []
+            for _ in cmds:
+                results.append(await websocket.recv())
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8751/commands',
+            max_in_flight=2,
+        )
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            self.assertEqual(calls, ["a", "c", "e", "b", "d"])
+            self.assertEqual(
+                sorted(Status.from_json(item).uuid for item in data),
+                sorted(cmd.uuid for cmd in cmds))
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_batch_results(self):  # pylint: disable=R0201
+        """
+        Tests if results are send as one batch.
+        """
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+
+            Arguments
+            ---------
+                integer1: first operand
+                integer2: second operand
+            """
+            return integer1 + integer2
+
+        cmds = [
+            Command("math_add", integer1=1, integer2=2),
+            Command("math_add", integer1=3, integer2=4),
+        ]
+        statuses = [
+            Status(Status.ID_OK, {
+                'method': 'math_add',
+                'result': 3
+            }, cmds[0].uuid),
+            Status(Status.ID_OK, {
+                'method': 'math_add',
+                'result': 7
+            }, cmds[1].uuid),
+        ]
+
+        Server(
+            [cmd.to_json() for cmd in cmds],
+            [Status.to_json_batch(statuses)],
+            batch_size=2,
+            batch_delay=10,
+        ).run()
+
+    def test_batch_results_delay(self):  # pylint: disable=R0201
+        """
+        Tests if an incomplete batch is send after the delay.
+        """
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+
+            Arguments
+            ---------
+                integer1: first operand
+                integer2: second operand
+            """
+            return integer1 + integer2
+
+        cmd = Command("math_add", integer1=1, integer2=2)
+        status = Status(Status.ID_OK, {
+            'method': 'math_add',
+            'result': 3
+        }, cmd.uuid)
+
+        Server(
+            [cmd.to_json()],
+            [Status.to_json_batch([status])],
+            batch_size=2,
+            batch_delay=0.1,
+        ).run()
+
+    def test_batch_commands(self):  # pylint: disable=R0201
+        """
+        Tests if a batch of commands is executed.
+        """
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+
+            Arguments
+            ---------
+                integer1: first operand
+                integer2: second operand
+            """
+            return integer1 + integer2
+
+        cmds = [
+            Command("math_add", integer1=1, integer2=2),
+            Command("math_add", integer1=3, integer2=4),
+        ]
+        statuses = [
+            Status(Status.ID_OK, {
+                'method': 'math_add',
+                'result': 3
+            }, cmds[0].uuid),
+            Status(Status.ID_OK, {
+                'method': 'math_add',
+                'result': 7
+            }, cmds[1].uuid),
+        ]
+
+        Server(
+            [Command.to_json_batch(cmds)],
+            [status.to_json() for status in statuses],
+        ).run()
+
+    def test_reconnect(self):
+        """
+        Tests if the receiver reconnects after the connection was lost and
+        sends the result of a command which finished without a connection.
+        """
+
+        @Rpc.method
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function, that sleeps.
+            """
+            await asyncio.sleep(sec)
+            return sec
+
+        cmd = Command('sleep', sec=0.2)
+        status = Status.ok({'method': 'sleep', 'result': 0.2}, cmd.uuid)
+
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+        sessions = []
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Aborts the first connection after sending the command and waits
+            for the result on the second connection.
+            """
+            sessions.append(websocket)
+            if len(sessions) == 1:
+                await websocket.send(cmd.to_json())
+                await asyncio.sleep(0.1)
+                websocket.writer.transport.abort()
+            else:
+                received.set_result(await websocket.recv())
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8751/commands',
+            reconnect=True,
+            reconnect_delay=1,
+        )
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            self.assertEqual(data, status.to_json())
+            self.assertEqual(len(sessions), 2)
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_rpc_method_cancel_command(self):  # pylint: disable=R0201
+        """
+        Tests if a running method is canceled with a cancel command.
+        """
+
+        @Rpc.method
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function, that can be canceled.
+            """
+            try:
+                await asyncio.sleep(sec)
+            except asyncio.CancelledError:
+                return -15
+
+        sleep_cmd = Command(method='sleep', sec=1)
+        status = Status.ok({'method': 'sleep', 'result': -15}, sleep_cmd.uuid)
+
+        Server(
+            [
+                sleep_cmd.to_json(),
+                sleep_cmd.to_json(),
+                Command.cancel(sleep_cmd.uuid).to_json(),
+            ],
+            [
+                status.to_json(),
+            ],
+        ).run()
+
+    def test_result_cache(self):
+        """
+        Tests if a duplicate command is answered from the result cache.
+        """
+        calls = []
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function which counts its calls.
+            """
+            calls.append((integer1, integer2))
+            return integer1 + integer2
+
+        cmd = Command("math_add", integer1=1, integer2=2)
+        status = Status.ok({'method': 'math_add', 'result': 3}, cmd.uuid)
+
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Sends the same command twice and collects both results.
+            """
+            results = []
+            for _ in range(2):
+                await websocket.send(cmd.to_json())
+                results.append(await websocket.recv())
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8751/commands',
+            result_cache_size=10,
+        )
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            self.assertEqual(data, [status.to_json(), status.to_json()])
+            self.assertEqual(calls, [(1, 2)])
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_result_cache_canceled(self):
+        """
+        Tests if the status of a canceled command is not cached, so the
+        command is executed again.
+        """
+        calls = []
+
+        @Rpc.method
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function which counts its calls.
+            """
+            calls.append(sec)
+            await asyncio.sleep(sec)
+            return sec
+
+        cmd = Command("sleep", sec=0.5)
+        again = Command("sleep", sec=0.1)
+        again.uuid = cmd.uuid
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Cancels the command and sends it again afterwards.
+            """
+            results = []
+            await websocket.send(cmd.to_json())
+            await asyncio.sleep(0.1)
+            await websocket.send(Command.cancel(cmd.uuid).to_json())
+            results.append(await websocket.recv())
+            await websocket.send(again.to_json())
+            results.append(await websocket.recv())
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8751/commands',
+            result_cache_size=10,
+        )
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            self.assertEqual(
+                Status.from_json(data[1]),
+                Status.ok({'method': 'sleep', 'result': 0.1}, cmd.uuid))
+            self.assertEqual(calls, [0.5, 0.1])
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_cancel_in_batch(self):
+        """
+        Tests if a command which is canceled in the same batch is answered
+        and the receiver keeps running.
+        """
+
+        @Rpc.method
+        async def sleep(sec):  # pylint: disable=R0201,W0612
+            """
+            Simple async rpc function.
+            """
+            await asyncio.sleep(sec)
+            return sec
+
+        cmd = Command("sleep", sec=0.5)
+        after = Command("sleep", sec=0)
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Sends the command and its cancel command in one batch.
+            """
+            results = []
+            await websocket.send(
+                Command.to_json_batch([cmd, Command.cancel(cmd.uuid)]))
+            results.append(await websocket.recv())
+            await websocket.send(after.to_json())
+            results.append(await websocket.recv())
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver('ws://127.0.0.1:8751/commands')
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            self.assertEqual(
+                Status.from_json(data[0]),
+                Status.err({
+                    'method': 'sleep',
+                    'result': 'canceled'
+                }, cmd.uuid))
+            self.assertEqual(
+                Status.from_json(data[1]),
+                Status.ok({
+                    'method': 'sleep',
+                    'result': 0
+                }, after.uuid))
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_memoized_method(self):
+        """
+        Tests if concurrent calls of a memoized method with the same
+        arguments are executed once.
+        """
+        calls = []
+
+        @Rpc.method(cache_size=10)
+        async def lookup(key):  # pylint: disable=R0201,W0612
+            """
+            Simple async lookup which counts its calls.
+            """
+            calls.append(key)
+            await asyncio.sleep(0.2)
+            return key.upper()
+
+        cmds = [
+            Command("lookup", key="a"),
+            Command("lookup", key="a"),
+            Command("lookup", key="b"),
+        ]
+        statuses = [
+            Status.ok({
+                'method': 'lookup',
+                'result': cmd.arguments['key'].upper()
+            }, cmd.uuid) for cmd in cmds
+        ]
+
+        Server(
+            [cmd.to_json() for cmd in cmds],
+            [status.to_json() for status in statuses],
+        ).run()
+
+        self.assertEqual(sorted(calls), ["a", "b"])
+
+    def test_memoized_method_cancel(self):
+        """
+        Tests if a command which awaits the memoized call of a canceled
+        command calls the method again.
+        """
+        calls = []
+
+        @Rpc.method(cache_size=10)
+        async def lookup(key):  # pylint: disable=R0201,W0612
+            """
+            Simple async lookup which counts its calls.
+            """
+            calls.append(key)
+            await asyncio.sleep(0.2)
+            return key.upper()
+
+        first = Command("lookup", key="a")
+        second = Command("lookup", key="a")
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Cancels the first command while the second one waits for it.
+            """
+            await websocket.send(Command.to_json_batch([first, second]))
+            await asyncio.sleep(0.05)
+            await websocket.send(Command.cancel(first.uuid).to_json())
+            results = [await websocket.recv(), await websocket.recv()]
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver('ws://127.0.0.1:8751/commands')
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            statuses = {
+                status.uuid: status
+                for status in map(Status.from_json, data)
+            }
+            self.assertEqual(statuses[first.uuid].status, Status.ID_ERR)
+            self.assertEqual(
+                statuses[second.uuid],
+                Status.ok({
+                    'method': 'lookup',
+                    'result': 'A'
+                }, second.uuid))
+            self.assertEqual(calls, ["a", "a"])
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    @unittest.skipIf(sys.version_info < (3, 6), "needs async generators")
+    def test_stream_method(self):
+        """
+        Tests if every chunk of a stream method is send as a partial status
+        and the final status holds the number of chunks or the error.
+        """
+        from tests.stream_methods import count_up, count_up_fail
+
+        Rpc.method(count_up)
+        Rpc.method(count_up_fail)
+
+        cmd = Command("count_up", n=3)
+        cmd_fail = Command("count_up_fail", n=2)
+
+        statuses = [
+            Status.ok({
+                'method': 'count_up',
+                'result': i,
+                'partial': True
+            }, cmd.uuid) for i in range(3)
+        ] + [
+            Status.ok({
+                'method': 'count_up',
+                'result': 3
+            }, cmd.uuid),
+        ] + [
+            Status.ok({
+                'method': 'count_up_fail',
+                'result': i,
+                'partial': True
+            }, cmd_fail.uuid) for i in range(2)
+        ] + [
+            Status.err({
+                'method': 'count_up_fail',
+                'result': 'stream failed'
+            }, cmd_fail.uuid),
+        ]
+
+        Server(
+            [cmd.to_json(), cmd_fail.to_json()],
+            [status.to_json() for status in statuses],
+        ).run()
+
+    def test_sharded(self):
+        """
+        Tests if the commands are executed by the worker processes of a
+        sharded receiver with every start method.
+        """
+        from tests.sharded_methods import rpc
+
+        for method in multiprocessing.get_all_start_methods():
+            with self.subTest(method=method):
+                cmds = [
+                    Command("in_worker", value=i, front=os.getpid())
+                    for i in range(6)
+                ]
+                statuses = [
+                    Status.ok({
+                        'method': 'in_worker',
+                        'result': [i, True]
+                    }, cmd.uuid) for (i, cmd) in enumerate(cmds)
+                ]
+
+                Server(
+                    [cmd.to_json() for cmd in cmds],
+                    [status.to_json() for status in statuses],
+                    rpc=rpc,
+                    workers=2,
+                    worker_modules=["tests.sharded_methods"],
+                    worker_start_method=method,
+                ).run()
+
+    def test_sharded_options(self):
+        """
+        Tests if invalid options of the sharded mode are rejected and if the
+        commands are distributed by their uuid.
+        """
+        url = 'ws://127.0.0.1:8750/commands'
+
+        self.assertRaises(ValueError, RpcReceiver, url, workers=0)
+        self.assertRaises(
+            ValueError, RpcReceiver, url, workers=2, reconnect=True)
+        self.assertRaises(
+            ValueError, RpcReceiver, url, rpc=RpcNamespace(), workers=2)
+
+        recv = RpcReceiver(url, rpc=Rpc.namespace("sharded"), workers=3)
+        uuids = [Command("test").uuid for _ in range(30)]
+
+        self.assertEqual([recv.shard(uuid) for uuid in uuids],
+                         [recv.shard(uuid) for uuid in uuids])
+        self.assertEqual(set(recv.shard(uuid) for uuid in uuids), {0, 1, 2})
+        recv.close()
+
+        # consecutive ids are spread evenly
+        recv = RpcReceiver(url, rpc=Rpc.namespace("sharded"), workers=4)
+        shards = [
+            recv.shard("b53f178311504483{:016x}".format(i)) for i in range(400)
+        ]
+
+        for worker in range(4):
+            self.assertGreater(shards.count(worker), 75)
+        recv.close()
+
+    def test_pipe_session(self):
+        """
+        Tests if the session of a worker raises _PipeClosed after the pipe to
+        the front process was closed.
+        """
+
+        async def check():
+            """
+            Exchanges a message and closes the pipe afterwards.
+            """
+            pipe, front = multiprocessing.Pipe()
+            session = _PipeSession(pipe, asyncio.get_event_loop())
+
+            front.send({'value': 1})
+            self.assertEqual(await session.recv(), {'value': 1})
+            await session.send({'value': 2})
+            self.assertEqual(front.recv(), {'value': 2})
+
+            front.close()
+            with self.assertRaises(_PipeClosed):
+                await session.recv()
+            with self.assertRaises(_PipeClosed):
+                await session.send({'value': 3})
+            await session.close()
+
+        asyncio.get_event_loop().run_until_complete(check())
+
+    @unittest.skipIf(sys.version_info < (3, 6), "needs async generators")
+    def test_stream_method_batch(self):
+        """
+        Tests if the chunks of a stream method are send without waiting for
+        a batch.
+        """
+        from tests.stream_methods import count_up
+
+        Rpc.method(count_up)
+        cmd = Command("count_up", n=3)
+
+        statuses = [
+            Status.ok({
+                'method': 'count_up',
+                'result': i,
+                'partial': True
+            }, cmd.uuid) for i in range(3)
+        ] + [
+            Status.ok({
+                'method': 'count_up',
+                'result': 3
+            }, cmd.uuid),
+        ]
+
+        Server(
+            [cmd.to_json()],
+            [Status.to_json_batch([status]) for status in statuses],
+            batch_size=10,
+            batch_delay=0.5,
+        ).run()
+
+    def test_invalid_command_in_batch(self):
+        """
+        Tests if an invalid entry of a batch is answered with an error and
+        the other commands are executed.
+        """
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function.
+            """
+            return integer1 + integer2
+
+        first = Command("math_add", integer1=1, integer2=2)
+        last = Command("math_add", integer1=3, integer2=4)
+        invalid = {'method': 'math_add', 'uuid': 'invalid'}
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Sends the batch and collects the results.
+            """
+            await websocket.send(
+                json.dumps([first.to_dict(), invalid, last.to_dict()]))
+            results = []
+            for _ in range(3):
+                results.append(Status.from_json(await websocket.recv()))
+            received.set_result(results)
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver('ws://127.0.0.1:8751/commands')
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            statuses = {status.uuid: status for status in data}
+            self.assertEqual(statuses['invalid'].status, Status.ID_ERR)
+            self.assertEqual(statuses['invalid'].payload['method'],
+                             'math_add')
+            self.assertEqual(
+                statuses[first.uuid],
+                Status.ok({
+                    'method': 'math_add',
+                    'result': 3
+                }, first.uuid))
+            self.assertEqual(
+                statuses[last.uuid],
+                Status.ok({
+                    'method': 'math_add',
+                    'result': 7
+                }, last.uuid))
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_invalid_arguments(self):
+        """
+        Tests if a command with invalid arguments is rejected before it is
+        executed.
+        """
+        calls = []
+
+        @Rpc.method
+        def math_add(integer1, integer2):  # pylint: disable=R0201,W0612
+            """
+            Simple add function which counts its calls.
+            """
+            calls.append((integer1, integer2))
+            return integer1 + integer2
+
+        cmd = Command("math_add", integer1=1)
+        status = Status.err({
+            'method': 'math_add',
+            'result': 'math_add() missing argument(s): integer2'
+        }, cmd.uuid)
+
+        Server(
+            [cmd.to_json()],
+            [status.to_json()],
+        ).run()
+
+        self.assertEqual(calls, [])
+
     def test_error_close_early(self):  # pylint: disable=R0201
         """
         Tests if RPC-Receiver doesn't raise an exception its closed early.
@@ -348,6 +1309,88 @@ class TestRpcReceiver(unittest.TestCase):
         )
         recv.close()
 
+    def test_encode_binary(self):
+        """
+        Tests if messages with bytes values are encoded as envelope and
+        other messages as text.
+        """
+        recv = RpcReceiver('ws://127.0.0.1:8750/commands')
+        message = Status.ok({'method': 'read', 'result': b'abc'}).to_dict()
+
+        self.assertIsInstance(recv.encode(message), bytes)
+        self.assertEqual(recv.decode(recv.encode(message)), message)
+        self.assertEqual(recv.encode({'a': 1}), '{"a": 1}')
+        self.assertEqual(recv.decode('{"a": 1}'), {'a': 1})
+        recv.close()
+
+    def test_binary_command(self):
+        """
+        Tests if a command in a binary envelope is validated and executed.
+        """
+
+        @Rpc.method
+        def reverse(data: bytes):  # pylint: disable=R0201,W0612
+            """
+            Returns the bytes in reversed order.
+            """
+            return bytes(data)[::-1]
+
+        cmd = Command("reverse", data=b"abc")
+        loop = asyncio.get_event_loop()
+        received = asyncio.Future()
+
+        async def handler(websocket, path=None):  # pylint: disable=W0613
+            """
+            Sends the command as envelope and waits for the result.
+            """
+            await websocket.send(pack_envelope(cmd.to_dict()))
+            received.set_result(await websocket.recv())
+
+        server = loop.run_until_complete(serve(handler))
+
+        recv = RpcReceiver('ws://127.0.0.1:8751/commands')
+        run = asyncio.ensure_future(recv.run())
+
+        try:
+            data = loop.run_until_complete(asyncio.wait_for(received, 10))
+            status = unpack_envelope(data)
+            self.assertEqual(status[Status.ID_STATUS], Status.ID_OK)
+            self.assertEqual(
+                bytes(status[Status.ID_PAYLOAD]['result']), b"cba")
+            loop.run_until_complete(asyncio.wait_for(run, 10))
+        finally:
+            recv.close()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+
+    def test_encode_compressed(self):
+        """
+        Tests if messages which reach the threshold are compressed.
+        """
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8750/commands',
+            compression=None,
+            compress_threshold=100)
+        small = {'a': 1}
+        large = {'files': ['file{}'.format(i) for i in range(100)]}
+
+        self.assertIsInstance(recv.encode(small), str)
+        self.assertIsInstance(recv.encode(large), bytes)
+        self.assertLess(len(recv.encode(large)), len(json.dumps(large)))
+        self.assertEqual(recv.decode(recv.encode(large)), large)
+        recv.close()
+
+    def test_compression_options(self):
+        """
+        Tests if the permessage-deflate settings are passed to websockets.
+        """
+        recv = RpcReceiver(
+            'ws://127.0.0.1:8750/commands',
+            compression_options={'client_max_window_bits': 10})
+        extension, = recv.connect_options['extensions']
+
+        self.assertEqual(extension.client_max_window_bits, 10)
+        recv.close()
 
     def test_error_close(self):  # pylint: disable=R0201
         """
@@ -355,12 +1398,11 @@ class TestRpcReceiver(unittest.TestCase):
         """
 
         @Rpc.method
-        @asyncio.coroutine
-        def async_sleep():  # pylint: disable=R0201,W0612
+        async def async_sleep():  # pylint: disable=R0201,W0612
             """
             Simple function that sleeps.
             """
-            yield from asyncio.sleep(10)
+            await asyncio.sleep(10)
 
         cmd = Command("async_sleep", integer1=1, integer2=2)
         status = Status.ok({'method': 'async_sleep', 'result': ''})
@@ -382,8 +1424,7 @@ class TestRpcReceiver(unittest.TestCase):
         """
 
         @Rpc.method
-        @asyncio.coroutine
-        def raises_async():  # pylint: disable=R0201,W0612
+        async def raises_async():  # pylint: disable=R0201,W0612
             """
             Simple async rpc function, that raises an Exception.
             """
@@ -411,13 +1452,12 @@ class TestRpcReceiver(unittest.TestCase):
         """
 
         @Rpc.method
-        @asyncio.coroutine
-        def sleep(sec):  # pylint: disable=R0201,W0612
+        async def sleep(sec):  # pylint: disable=R0201,W0612
             """
             Simple async rpc function, that raises an Exception.
             """
             try:
-                yield from asyncio.sleep(sec)
+                await asyncio.sleep(sec)
             except asyncio.CancelledError:
                 return -15
 
@@ -435,4 +1475,5 @@ class TestRpcReceiver(unittest.TestCase):
             [
                 status.to_json(),
             ],
+            cancel_on_duplicate=True,
         ).run()
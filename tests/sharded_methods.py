@@ -0,0 +1,19 @@
+"""
+Methods for the tests of the sharded receiver. The worker processes import
+this module, so the methods are registered with every start method.
+"""
+
+import os
+
+from utils import Rpc
+
+rpc = Rpc.namespace("sharded")
+
+
+@rpc.method
+def in_worker(value, front):
+    """
+    Returns the value and if the function is executed in another process
+    than the front process.
+    """
+    return [value, os.getpid() != front]
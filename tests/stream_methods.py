@@ -0,0 +1,25 @@
+"""
+Stream methods (async generator functions) for the tests. Async generators
+need Python 3.6, so this module is only imported by tests which are skipped
+on older versions.
+"""
+
+import asyncio
+
+
+async def count_up(n):
+    """
+    Yields the numbers from 0 to n - 1.
+    """
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+async def count_up_fail(n):
+    """
+    Yields the numbers from 0 to n - 1 and fails afterwards.
+    """
+    for i in range(n):
+        yield i
+    raise ValueError("stream failed")
@@ -0,0 +1,88 @@
+"""
+Test file for the cache module.
+"""
+
+import unittest
+
+from utils.cache import LruCache
+
+
+class Clock:
+    """
+    Represents a clock which is set manually.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLruCache(unittest.TestCase):
+    """
+    Testcases for the LruCache class.
+    """
+
+    def test_get(self):
+        """
+        Tests if stored values are returned.
+        """
+        cache = LruCache(2)
+        cache["a"] = 1
+
+        self.assertEqual(cache["a"], 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("b", 2), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertRaises(KeyError, cache.__getitem__, "b")
+
+    def test_evict_least_recently_used(self):
+        """
+        Tests if the least recently used entry is removed.
+        """
+        cache = LruCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.get("a")
+        cache["c"] = 3
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_ttl(self):
+        """
+        Tests if expired entries are treated as missing.
+        """
+        clock = Clock()
+        cache = LruCache(2, ttl=10, clock=clock)
+        cache["a"] = 1
+
+        clock.now = 9
+        self.assertEqual(cache.get("a"), 1)
+
+        clock.now = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_pop_clear(self):
+        """
+        Tests if entries can be removed.
+        """
+        cache = LruCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIsNone(cache.pop("a"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_maxsize(self):
+        """
+        Tests if a cache without entries is rejected.
+        """
+        self.assertRaises(ValueError, LruCache, 0)
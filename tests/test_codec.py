@@ -0,0 +1,75 @@
+"""
+Test file for the codec module.
+"""
+
+import unittest
+
+from utils.codec import (Codec, JsonCodec, get_codec, available_codecs)
+
+MESSAGE = {
+    "method": "test_func",
+    "arguments": {
+        "a": [1, 2.5, "drei", None, True],
+        "b": {
+            "c": "vier"
+        },
+    },
+    "uuid": "0123456789abcdef",
+}
+
+
+class TestCodec(unittest.TestCase):
+    """
+    Testcases for the codecs.
+    """
+
+    def assertRoundTrip(self, codec):
+        """
+        Checks if the codec decodes its own encoded messages.
+        """
+        data = codec.dumps(MESSAGE)
+        self.assertIsInstance(data, bytes if codec.binary else str)
+        self.assertEqual(codec.loads(data), MESSAGE)
+
+    def test_available(self):
+        """
+        Tests if all available codecs decode their own messages.
+        """
+        self.assertIn("json", available_codecs())
+
+        for name in available_codecs():
+            with self.subTest(codec=name):
+                self.assertRoundTrip(get_codec(name))
+
+    def test_text_codecs_compatible(self):
+        """
+        Tests if the messages of text codecs can be decoded by the json codec.
+        """
+        for name in available_codecs():
+            codec = get_codec(name)
+            if not codec.binary:
+                with self.subTest(codec=name):
+                    self.assertEqual(JsonCodec().loads(codec.dumps(MESSAGE)),
+                                     MESSAGE)
+
+    def test_get_codec(self):
+        """
+        Tests if get_codec returns the json codec by default and passes
+        instances through.
+        """
+        codec = JsonCodec()
+        self.assertIsInstance(get_codec(), JsonCodec)
+        self.assertIs(get_codec(codec), codec)
+        self.assertRaises(ValueError, get_codec, "unknown")
+
+    def test_base_codec(self):
+        """
+        Tests if the base codec and incomplete codecs can not be created.
+        """
+
+        class Incomplete(Codec):  #pylint: disable=C0111,W0223
+            def dumps(self, obj):
+                return ""
+
+        self.assertRaises(TypeError, Codec)
+        self.assertRaises(TypeError, Incomplete)
@@ -4,6 +4,7 @@ Test file for the command module
 
 import unittest
 from utils import Command, ProtocolError
+from utils.typecheck import compile_schema
 
 
 class TestCommand(unittest.TestCase):
@@ -74,3 +75,62 @@ class TestCommand(unittest.TestCase):
         string = '{{"{}": "name", "{}": {{"a": "drei", "b": "vier"}}, "{}":2}}'.format(
             Command.ID_METHOD, Command.ID_ARGUMENTS, Command.ID_UUID)
         self.assertRaises(ProtocolError, Command.from_json, string)
+
+    def test_command_json_batch(self):
+        """
+        Tests if multiple commands can be encoded and decoded as a batch.
+        """
+        cmds = [Command("test_func", a=2), Command("test_func2", b="vier")]
+        decoded = Command.from_json_batch(Command.to_json_batch(cmds))
+
+        self.assertEqual(cmds, decoded)
+        self.assertEqual([cmd.uuid for cmd in cmds],
+                         [cmd.uuid for cmd in decoded])
+
+    def test_command_from_json_batch_ProtocolError(self):
+        """
+        Expects ProtocolError from from_json_batch if the data is not an
+        array of json objects.
+        """
+        self.assertRaises(ProtocolError, Command.from_json_batch, '{}')
+        self.assertRaises(ProtocolError, Command.from_json_batch, '[1]')
+
+    def test_command_to_dict(self):
+        """
+        Tests if to_dict holds all fields and equals dict(...).
+        """
+        cmd = Command("test_func", a=2)
+
+        self.assertEqual(cmd.to_dict(), {
+            Command.ID_METHOD: "test_func",
+            Command.ID_ARGUMENTS: {"a": 2},
+            Command.ID_UUID: cmd.uuid,
+        })
+        self.assertEqual(cmd.to_dict(), dict(cmd))
+        self.assertEqual(set(cmd.to_dict()), set(Command.FIELDS))
+        self.assertFalse(hasattr(cmd, "__dict__"))
+
+    def test_command_cancel(self):
+        """
+        Tests if a cancel command keeps the uuid of the canceled command.
+        """
+        cmd = Command("test_func", a=2)
+        cancel = Command.from_json(Command.cancel(cmd.uuid).to_json())
+
+        self.assertTrue(cancel.is_cancel())
+        self.assertFalse(cmd.is_cancel())
+        self.assertEqual(cancel.uuid, cmd.uuid)
+
+    def test_command_from_json_schema(self):
+        """
+        Expects ProtocolError if the arguments do not match the schema.
+        """
+        schema = compile_schema({"a": int}, "args")
+        cmd = Command("test_func", a=2)
+
+        self.assertEqual(Command.from_json(cmd.to_json(), schema), cmd)
+        self.assertRaisesRegex(ProtocolError, r"args\['a'\] has to be int",
+                               Command.from_json,
+                               Command("test_func", a="2").to_json(), schema)
+        self.assertRaisesRegex(ProtocolError, "command is missing the key",
+                               Command.from_json, '{"method": "test_func"}')
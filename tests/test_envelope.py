@@ -0,0 +1,116 @@
+"""
+Test file for the envelope module.
+"""
+
+import json
+import unittest
+
+from utils import Command, JsonCodec, ProtocolError, Status
+from utils.envelope import (compress_envelope, has_bodies, is_envelope,
+                            pack_envelope, unpack_envelope)
+
+
+class BinaryCodec(JsonCodec):
+    """
+    Represents a binary codec for the tests.
+    """
+    binary = True
+
+    def dumps(self, obj):
+        return super().dumps(obj).encode()
+
+    def loads(self, data):
+        return super().loads(data.decode())
+
+
+class TestEnvelope(unittest.TestCase):
+    """
+    Testcases for the binary envelope.
+    """
+
+    def test_has_bodies(self):
+        """
+        Tests if bytes values are found in dictionaries and batches.
+        """
+        self.assertTrue(has_bodies({"a": {"b": b"data"}}))
+        self.assertTrue(has_bodies([{"a": 1}, {"a": bytearray(2)}]))
+        self.assertFalse(has_bodies({"a": [b"data"], "b": "text"}))
+        self.assertFalse(has_bodies([1, "text"]))
+
+    def test_status(self):
+        """
+        Tests if a status with a bytes payload is restored with memoryview
+        values.
+        """
+        status = Status.ok({
+            'method': 'read',
+            'result': b"\x00\x01\x02"
+        })
+        message = unpack_envelope(pack_envelope(status.to_dict()))
+
+        self.assertIsInstance(message['payload']['result'], memoryview)
+        self.assertEqual(message['payload']['result'], b"\x00\x01\x02")
+        self.assertEqual(Status.from_dict(message), status)
+
+    def test_command_batch(self):
+        """
+        Tests if a batch of commands with bytes, bytearray and memoryview
+        arguments is restored.
+        """
+        cmds = [
+            Command("write", data=b"abc", view=memoryview(b"de")),
+            Command("noop"),
+            Command("write", data=bytearray(b"fg"), name="file"),
+        ]
+        messages = unpack_envelope(
+            pack_envelope([cmd.to_dict() for cmd in cmds]))
+
+        self.assertEqual([Command.from_dict(msg) for msg in messages], cmds)
+
+    def test_original_unchanged(self):
+        """
+        Tests if packing does not modify the message.
+        """
+        message = {"payload": {"result": b"abc"}}
+        pack_envelope(message)
+
+        self.assertEqual(message, {"payload": {"result": b"abc"}})
+
+    def test_compressed(self):
+        """
+        Tests if compressed messages and envelopes are restored.
+        """
+        listing = {"files": ["file{}.txt".format(i) for i in range(100)]}
+        data = compress_envelope(json.dumps(listing))
+
+        self.assertLess(len(data), len(json.dumps(listing)))
+        self.assertEqual(unpack_envelope(data), listing)
+
+        message = {"result": b"abc" * 100, "name": "file"}
+        data = compress_envelope(pack_envelope(message), envelope=True)
+
+        self.assertLess(len(data), 300)
+        self.assertEqual(unpack_envelope(data), message)
+
+    def test_is_envelope(self):
+        """
+        Tests if envelopes are distinguished from encoded messages.
+        """
+        data = pack_envelope({"a": b"abc"})
+
+        self.assertTrue(is_envelope(data))
+        self.assertFalse(is_envelope('{"a": 1}'))
+        self.assertTrue(is_envelope(data, BinaryCodec()))
+        self.assertFalse(is_envelope(b'\x81\xa1a\x01', BinaryCodec()))
+
+    def test_invalid(self):
+        """
+        Tests if a ProtocolError gets thrown for invalid envelopes.
+        """
+        data = pack_envelope({"a": b"abcdef"})
+
+        self.assertRaises(ProtocolError, unpack_envelope, b"")
+        self.assertRaises(ProtocolError, unpack_envelope, data[:4] + b"{")
+        self.assertRaises(ProtocolError, unpack_envelope, data[:-1])
+        self.assertRaises(ProtocolError, unpack_envelope,
+                          compress_envelope(b"abc")[:-2])
@@ -0,0 +1,66 @@
+"""
+Test file for the ids module.
+"""
+
+import os
+import string
+import unittest
+
+from utils import Command, Status
+from utils.ids import IdGenerator, new_id, set_id_generator
+
+
+class TestIds(unittest.TestCase):
+    """
+    Testcases for the identifier generation.
+    """
+
+    def tearDown(self):
+        set_id_generator(IdGenerator())
+
+    def test_format(self):
+        """
+        Tests if the identifiers have the format of uuid4().hex.
+        """
+        ident = new_id()
+        self.assertEqual(len(ident), 32)
+        self.assertTrue(all(char in string.hexdigits for char in ident))
+
+    def test_unique(self):
+        """
+        Tests if the identifiers are unique.
+        """
+        self.assertEqual(len({new_id() for _ in range(1000)}), 1000)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_fork(self):
+        """
+        Tests if a new prefix is drawn in a forked process.
+        """
+        generator = IdGenerator()
+        first = generator()
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            os.write(write, generator().encode())
+            os._exit(0)  # pylint: disable=W0212
+
+        os.close(write)
+        with os.fdopen(read) as pipe:
+            second = pipe.read()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(len(second), 32)
+        self.assertNotEqual(first[:16], second[:16])
+        self.assertEqual(generator()[:16], first[:16])
+
+    def test_set_generator(self):
+        """
+        Tests if Command and Status use the replaced generator.
+        """
+        set_id_generator(lambda: "fixed")
+        self.assertEqual(Command("test").uuid, "fixed")
+        self.assertEqual(Status.ok("test").uuid, "fixed")
+        self.assertEqual(Status.err("test", "other").uuid, "other")
@@ -4,7 +4,9 @@ Testcases for path.py module.
 import unittest
 import os
 
-from utils.path import remove_trailing_path_seperator
+from utils.path import (normalize_path, normalize_paths,
+                        remove_trailing_path_seperator,
+                        remove_trailing_path_seperators)
 
 
 class PathTests(unittest.TestCase):
@@ -31,3 +33,37 @@ class PathTests(unittest.TestCase):
             "",
             os.path.basename(remove_trailing_path_seperator(path)),
         )
+
+    def test_remove_trailing_batch(self):
+        paths = ["/home/user/test/", "C:\\test\\", "test", ""]
+        self.assertEqual(
+            ["/home/user/test", "C:\\test", "test", ""],
+            remove_trailing_path_seperators(paths),
+        )
+        self.assertEqual(
+            ["/home/user/test", "C:\\test", "test", ""],
+            remove_trailing_path_seperators(iter(paths)),
+        )
+        self.assertRaisesRegex(
+            TypeError,
+            "index 1 has type NoneType",
+            remove_trailing_path_seperators,
+            ["test", None],
+        )
+
+    def test_normalize(self):
+        self.assertEqual("home/user/test",
+                         normalize_path("home\\\\user//test\\/"))
+        self.assertEqual("\\home\\user", normalize_path("/home/user/", "\\"))
+        self.assertEqual("/", normalize_path("///"))
+        self.assertEqual("C:/", normalize_path("C:\\\\"))
+        self.assertEqual("C:/test", normalize_path("C:\\test\\"))
+        self.assertEqual("//server/share", normalize_path("\\\\server\\share"))
+        self.assertEqual("", normalize_path(""))
+        self.assertRaises(TypeError, normalize_path, b"test")
+
+    def test_normalize_batch(self):
+        paths = ("a\\b", "a//b/", "/")
+        self.assertEqual(["a/b", "a/b", "/"], normalize_paths(paths))
+        self.assertEqual(["a/b", "a/b", "/"], normalize_paths(iter(paths)))
+        self.assertRaises(TypeError, normalize_paths, ["a", 1])
@@ -2,8 +2,11 @@
 Test file for the rpc module.
 """
 
+import asyncio
+import operator
+import sys
 import unittest
-from utils import Rpc, ProtocolError
+from utils import Rpc, RpcMethod, RpcNamespace, ProtocolError
 
 
 class TestRpc(unittest.TestCase):
@@ -59,6 +62,202 @@ class TestRpc(unittest.TestCase):
         self.assertEqual(Rpc.get("test"), test)
         self.assertEqual(Rpc.get("test2"), test2)
 
+    def test_rpc_get_unknown(self):
+        """
+        Tests if an unknown function is not found between registered ones.
+        """
+
+        @Rpc.method
+        def test():  #pylint: disable=C0111,W0612
+            pass
+
+        self.assertRaises(ProtocolError, Rpc.get, "test2")
+
+    def test_rpc_lookup(self):
+        """
+        Tests if lookup returns the adapter of a registered function.
+        """
+
+        @Rpc.method
+        def test(first):  #pylint: disable=C0111
+            return first
+
+        method = Rpc.lookup("test")
+        self.assertEqual(method.func, test)
+        self.assertEqual(method.name, "test")
+        self.assertEqual(method.kind, RpcMethod.KIND_FUNCTION)
+        self.assertFalse(method.is_async)
+        self.assertEqual(method.call(first=2), 2)
+        self.assertRaises(ProtocolError, Rpc.lookup, "test2")
+
+    def test_rpc_generator(self):
+        """
+        Tests if generator functions are wrapped into awaitable coroutines.
+        """
+
+        @Rpc.method
+        def test(first):  #pylint: disable=C0111
+            yield from asyncio.sleep(0)
+            return first
+
+        method = Rpc.lookup("test")
+        self.assertEqual(method.kind, RpcMethod.KIND_GENERATOR)
+        self.assertTrue(method.is_async)
+
+        async def call():  #pylint: disable=C0111
+            return await method.call(first=2)
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(call()), 2)
+        finally:
+            loop.close()
+
+    def test_rpc_execution(self):
+        """
+        Tests if the execution is stored for a registered function.
+        """
+
+        @Rpc.method(execution=RpcMethod.EXECUTION_THREAD)
+        def test():  #pylint: disable=C0111
+            pass
+
+        self.assertEqual(Rpc.get("test"), test)
+        self.assertEqual(
+            Rpc.lookup("test").execution, RpcMethod.EXECUTION_THREAD)
+
+    def test_rpc_execution_unknown(self):
+        """
+        Tests if an unknown execution is rejected.
+        """
+
+        def test():  #pylint: disable=C0111
+            pass
+
+        self.assertRaises(ValueError, Rpc.method(execution="gpu"), test)
+
+    def test_rpc_max_in_flight(self):
+        """
+        Tests if the in-flight limit is stored and checked.
+        """
+
+        @Rpc.method(max_in_flight=2)
+        def test():  #pylint: disable=C0111
+            pass
+
+        def test2():  #pylint: disable=C0111
+            pass
+
+        self.assertEqual(Rpc.lookup("test").max_in_flight, 2)
+        self.assertRaises(ValueError, Rpc.method(max_in_flight=0), test2)
+
+    def test_rpc_cache(self):
+        """
+        Tests if memoized functions get a result cache.
+        """
+
+        @Rpc.method(cache_size=2, cache_ttl=10)
+        def test():  #pylint: disable=C0111
+            pass
+
+        @Rpc.method
+        def test2():  #pylint: disable=C0111
+            pass
+
+        self.assertEqual(Rpc.lookup("test").results.maxsize, 2)
+        self.assertEqual(Rpc.lookup("test").results.ttl, 10)
+        self.assertIsNone(Rpc.lookup("test2").results)
+        self.assertEqual(
+            RpcMethod.cache_key({"a": 1, "b": [2]}),
+            RpcMethod.cache_key({"b": [2], "a": 1}))
+        self.assertNotEqual(
+            RpcMethod.cache_key({"a": 1}), RpcMethod.cache_key({"a": "1"}))
+        self.assertEqual(
+            RpcMethod.cache_key({"a": {"b": 1, "c": 2}}),
+            RpcMethod.cache_key({"a": {"c": 2, "b": 1}}))
+        self.assertEqual(
+            RpcMethod.cache_key({"data": memoryview(b"aaaa")}),
+            RpcMethod.cache_key({"data": b"aaaa"}))
+        self.assertNotEqual(
+            RpcMethod.cache_key({"data": memoryview(b"aaaa")}),
+            RpcMethod.cache_key({"data": memoryview(b"bbbb")}))
+        self.assertIsNone(RpcMethod.cache_key({"a": object()}))
+
+    @unittest.skipIf(sys.version_info < (3, 6), "needs async generators")
+    def test_rpc_stream(self):
+        """
+        Tests if async generator functions are registered as stream methods,
+        which can neither be memoized nor executed in a pool.
+        """
+        from tests.stream_methods import count_up
+
+        Rpc.method(count_up)
+        method = Rpc.lookup("count_up")
+
+        self.assertEqual(method.kind, RpcMethod.KIND_STREAM)
+        self.assertTrue(method.is_stream)
+        self.assertFalse(method.is_async)
+        self.assertRaises(ValueError, RpcMethod, count_up, cache_size=1)
+        self.assertRaises(
+            ValueError,
+            RpcMethod,
+            count_up,
+            execution=RpcMethod.EXECUTION_THREAD)
+
+    def test_rpc_validate(self):
+        """
+        Tests if the arguments are checked against the signature.
+        """
+
+        @Rpc.method
+        def test(first, second: int, third: float = 1.0, *,
+                 fourth=None):  #pylint: disable=C0111,W0613
+            pass
+
+        method = Rpc.lookup("test")
+        method.validate({"first": "a", "second": 2})
+        method.validate({"first": "a", "second": 2, "third": 3, "fourth": 4})
+
+        self.assertRaisesRegex(TypeError, "missing.*second", method.validate,
+                               {"first": "a"})
+        self.assertRaisesRegex(TypeError, "unknown.*fifth", method.validate,
+                               {"first": "a", "second": 2, "fifth": 5})
+        self.assertRaisesRegex(TypeError, "second has to be int",
+                               method.validate, {"first": "a", "second": "2"})
+        self.assertRaisesRegex(TypeError, "third has to be float",
+                               method.validate,
+                               {"first": "a", "second": 2, "third": "3"})
+
+    def test_rpc_validate_bytes(self):
+        """
+        Tests if a bytes parameter accepts the memoryview values of a binary
+        envelope.
+        """
+
+        @Rpc.method
+        def test(data: bytes):  #pylint: disable=C0111,W0613
+            pass
+
+        method = Rpc.lookup("test")
+        method.validate({"data": b"abc"})
+        method.validate({"data": bytearray(b"abc")})
+        method.validate({"data": memoryview(b"abc")})
+
+        self.assertRaisesRegex(TypeError, "data has to be bytes",
+                               method.validate, {"data": "abc"})
+
+    def test_rpc_validate_var_keyword(self):
+        """
+        Tests if functions with **kwargs accept unknown arguments.
+        """
+
+        @Rpc.method
+        def test(first, **kwargs):  #pylint: disable=C0111
+            pass
+
+        Rpc.lookup("test").validate({"first": 1, "second": 2})
+        self.assertRaises(TypeError, Rpc.lookup("test").validate, {})
+
     @unittest.expectedFailure
     def test_rpc_multiple_same_name(self):  # pylint: disable=R0201
         """
@@ -74,3 +273,65 @@ class TestRpc(unittest.TestCase):
             @Rpc.method
             def test(self):
                 pass
+
+
+class TestRpcNamespace(unittest.TestCase):
+    """
+    Testcases for the RpcNamespace class.
+    """
+
+    def setUp(self):
+        Rpc.clear()
+
+    def test_namespace_independent(self):
+        """
+        Tests if methods of different namespaces do not interfere.
+        """
+        first = RpcNamespace("first")
+        second = RpcNamespace("second")
+
+        @first.method
+        def test():  #pylint: disable=C0111
+            pass
+
+        @second.method
+        def test():  #pylint: disable=C0111,E0102
+            pass
+
+        self.assertEqual(list(first), [first.get("test")])
+        self.assertEqual(list(second), [second.get("test")])
+        self.assertNotEqual(first.get("test"), second.get("test"))
+        self.assertRaises(ProtocolError, Rpc.get, "test")
+
+    def test_namespace_table(self):
+        """
+        Tests if the dispatch table is read only and rebuild after a change.
+        """
+        namespace = RpcNamespace()
+
+        @namespace.method
+        def test():  #pylint: disable=C0111
+            pass
+
+        table = namespace.table
+        self.assertEqual(list(table), ["test"])
+        self.assertEqual(table["test"].func, test)
+        self.assertRaises(TypeError, operator.setitem, table, "test2", test)
+
+        @namespace.method
+        def test2():  #pylint: disable=C0111
+            pass
+
+        self.assertEqual(namespace.get("test2"), test2)
+
+        namespace.clear()
+        self.assertRaises(ProtocolError, namespace.get, "test")
+
+    def test_namespace_named(self):
+        """
+        Tests if Rpc.namespace(...) returns the same namespace for a name.
+        """
+        namespace = Rpc.namespace("named")
+        self.assertIs(namespace, Rpc.namespace("named"))
+        self.assertEqual(namespace.name, "named")
+        self.assertIsNot(namespace, Rpc.default)
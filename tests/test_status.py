@@ -4,6 +4,7 @@ Test file for the status module.
 
 import unittest
 from utils.status import Status, FormatError
+from utils.typecheck import compile_schema
 
 
 class TestStatus(unittest.TestCase):
@@ -172,6 +173,40 @@ class TestStatus(unittest.TestCase):
         """
         self.assertRaises(FormatError, Status.from_json, '{}')
 
+    def test_json_batch(self):
+        """
+        Tests if multiple statuses can be encoded and decoded as a batch.
+        """
+        statuses = [Status.ok("Hello World"), Status.err([0, 1, 2])]
+        decoded = Status.from_json_batch(Status.to_json_batch(statuses))
+
+        self.assertEqual(statuses, decoded)
+        self.assertEqual([status.uuid for status in statuses],
+                         [status.uuid for status in decoded])
+
+    def test_json_batch_format_error(self):
+        """
+        Tests if a FormatError gets thrown if the batch is not an array of
+        json objects.
+        """
+        self.assertRaises(FormatError, Status.from_json_batch, '{}')
+        self.assertRaises(FormatError, Status.from_json_batch, '[1]')
+
+    def test_to_dict(self):
+        """
+        Tests if to_dict holds all fields and equals dict(...).
+        """
+        status = Status.ok("Hello World")
+
+        self.assertEqual(status.to_dict(), {
+            Status.ID_STATUS: Status.ID_OK,
+            Status.ID_PAYLOAD: "Hello World",
+            Status.ID_UUID: status.uuid,
+        })
+        self.assertEqual(status.to_dict(), dict(status))
+        self.assertEqual(set(status.to_dict()), set(Status.FIELDS))
+        self.assertFalse(hasattr(status, "__dict__"))
+
     def test_status_is_ok(self):
         """
         Tests if a status that has no error returns true on
@@ -191,3 +226,16 @@ class TestStatus(unittest.TestCase):
         Tests if Status.as_js() returns a string
         """
         isinstance(Status.as_js(), str)
+
+    def test_from_json_schema(self):
+        """
+        Tests if a FormatError gets thrown if the payload does not match the
+        schema.
+        """
+        schema = compile_schema([int], "payload")
+        status = Status.ok([1, 2])
+
+        self.assertEqual(Status.from_json(status.to_json(), schema), status)
+        self.assertRaisesRegex(FormatError, r"payload\[0\] has to be int",
+                               Status.from_json,
+                               Status.ok(["1"]).to_json(), schema)
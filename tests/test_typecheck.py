@@ -1,9 +1,16 @@
 """
 Tests for module utils.typecheck.
 """
+import array
 import unittest
 
-from utils.typecheck import ensure_type, ensure_type_array
+from utils.typecheck import (Optional, Union, compile_schema, ensure_type,
+                             ensure_type_array, type_checker)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TypeCheckTests(unittest.TestCase):
@@ -45,6 +52,40 @@ class TypeCheckTests(unittest.TestCase):
             "str",
         )
 
+    def test_type_type_error_after_match(self):
+        ensure_type("test", 1, int, "str")
+
+    def test_type_error_multi_message(self):
+        self.assertRaisesRegex(
+            TypeError,
+            "has to be int or float.*found str",
+            ensure_type,
+            "test",
+            "hello world",
+            int,
+            float,
+        )
+
+    def test_type_checker(self):
+        check = type_checker("test", int, str)
+        check(1)
+        check("hello world")
+        self.assertRaisesRegex(
+            TypeError,
+            "test has to be int or str.*found float",
+            check,
+            1.5,
+        )
+
+    def test_type_checker_type_error(self):
+        self.assertRaisesRegex(
+            ValueError,
+            "in.*types is not a type.*found str",
+            type_checker,
+            "str",
+            "str",
+        )
+
     def test_type_array_error(self):
         test = [1, "hello world", 3]
 
@@ -76,6 +117,63 @@ class TypeCheckTests(unittest.TestCase):
             int,
         )
 
+    def test_type_array_buffers(self):
+        ensure_type_array("test", b"hello", int)
+        ensure_type_array("test", bytearray(b"hello"), int)
+        ensure_type_array("test", array.array('d', [1.0, 2.0]), float)
+        ensure_type_array("test", memoryview(b"hello"), int)
+        ensure_type_array("test", memoryview(b"hello").cast('c'), bytes)
+
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_type_array_numpy(self):
+        ensure_type_array("test", numpy.arange(3), int)
+        ensure_type_array("test", numpy.arange(3, dtype=numpy.uint8), int)
+        ensure_type_array("test", numpy.arange(3, dtype=numpy.float32), float)
+        ensure_type_array("test", numpy.array([True, False]), bool)
+        ensure_type_array("test", numpy.array(["a", "b"]), str)
+        self.assertRaisesRegex(
+            TypeError,
+            ".*has to be int.*\n.*index 0 has type float",
+            ensure_type_array,
+            "test",
+            numpy.arange(3, dtype=numpy.float64),
+            int,
+        )
+
+    def test_type_array_buffer_error(self):
+        self.assertRaisesRegex(
+            TypeError,
+            ".*has to be int.*\n.*index 0 has type float",
+            ensure_type_array,
+            "test",
+            array.array('d', [1.0, 2.0]),
+            int,
+        )
+
+    def test_type_array_generator(self):
+        ensure_type_array("test", (i for i in range(3)), int)
+        self.assertRaisesRegex(
+            TypeError,
+            ".*index 1 has type str",
+            ensure_type_array,
+            "test",
+            (i for i in [1, "hello world"]),
+            int,
+        )
+
+    def test_type_array_max_errors(self):
+        test = ["hello world"] * 5
+
+        self.assertRaisesRegex(
+            TypeError,
+            "index 1 has type str\n\tand 3 more elements$",
+            ensure_type_array,
+            "test",
+            test,
+            int,
+            max_errors=2,
+        )
+
     def test_type_array_type_error(self):
         self.assertRaisesRegex(
             ValueError,
@@ -85,3 +183,42 @@ class TypeCheckTests(unittest.TestCase):
             "str",
             "str",
         )
+
+    def test_schema(self):
+        check = compile_schema({
+            "a": [int],
+            "b": Optional(str),
+            "c": Union(int, [str]),
+        }, "args")
+
+        check({"a": [1, 2], "c": 3})
+        check({"a": [], "b": None, "c": ["x"], "d": 1.5})
+
+        self.assertRaisesRegex(
+            TypeError,
+            r"^args\['a'\]\[1\] has to be int. \(found str\)$",
+            check,
+            {"a": [1, "2"], "c": 3},
+        )
+        self.assertRaisesRegex(
+            TypeError,
+            "^args is missing the key 'c'.$",
+            check,
+            {"a": []},
+        )
+        self.assertRaisesRegex(
+            TypeError,
+            r"^args\['c'\] has to be int or list. \(found float\)$",
+            check,
+            {"a": [], "c": 1.5},
+        )
+        self.assertRaisesRegex(
+            TypeError,
+            "^args has to be dict. \\(found list\\)$",
+            check,
+            [],
+        )
+
+    def test_schema_value_error(self):
+        self.assertRaises(ValueError, compile_schema, [int, str])
+        self.assertRaises(ValueError, compile_schema, {"a": "str"})
@@ -5,8 +5,13 @@ Init file for utils library.
 from utils.rpc import *
 from utils.status import *
 from utils.command import *
+from utils.codec import *
+from utils.ids import *
+from utils.cache import *
+from utils.envelope import *
 from utils.rpc_extra import *
 
-from . import rpc, rpc_extra, status, command
+from . import rpc, rpc_extra, status, command, codec, ids, cache, envelope
 
-__all__ = (status.__all__ + command.__all__ + rpc.__all__ + rpc_extra.__all__)
+__all__ = (status.__all__ + command.__all__ + codec.__all__ + ids.__all__ +
+           cache.__all__ + envelope.__all__ + rpc.__all__ + rpc_extra.__all__)
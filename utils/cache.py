@@ -0,0 +1,101 @@
+"""
+This module contains a size bounded cache whose entries can expire.
+"""
+
+import time
+from collections import OrderedDict
+
+__all__ = ["LruCache"]
+
+
+class LruCache:
+    """
+    Represents a cache which holds at most maxsize entries. If the cache is
+    full the least recently used entry is removed. If ttl is set, entries
+    which are older than ttl seconds are treated as missing.
+
+    Arguments
+    ---------
+        maxsize: maximal number of entries
+        ttl: lifetime of an entry in seconds or None for no limit
+        clock: function which returns the current time in seconds
+    """
+
+    def __init__(self, maxsize, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize has to be at least 1.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        expires, value = self._entries[key]
+
+        if expires is not None and expires <= self._clock():
+            del self._entries[key]
+            raise KeyError(key)
+
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        expires = None if self.ttl is None else self._clock() + self.ttl
+
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of an entry.
+
+        Arguments
+        ---------
+            key: hashable object
+            default: returned if no valid entry exists
+
+        Returns
+        -------
+            The value or default
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, default=None):
+        """
+        Removes an entry and returns its value.
+
+        Arguments
+        ---------
+            key: hashable object
+            default: returned if no valid entry exists
+
+        Returns
+        -------
+            The value or default
+        """
+        value = self.get(key, default)
+        self._entries.pop(key, None)
+        return value
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        self._entries.clear()
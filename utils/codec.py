@@ -0,0 +1,197 @@
+"""
+This module contains codecs which encode and decode the messages which are
+send over a websocket. The stdlib json codec is always available, the other
+codecs depend on optional packages.
+"""
+
+import abc
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__all__ = [
+    "Codec", "JsonCodec", "OrjsonCodec", "UjsonCodec", "MsgpackCodec",
+    "get_codec", "available_codecs"
+]
+
+
+class Codec(abc.ABC):
+    """
+    Represents an encoding of python objects (dictionaries, lists, strings,
+    numbers, booleans and None) into websocket messages. A codec with binary
+    set to True produces bytes, which are send as binary frames. Otherwise
+    the codec produces strings, which are send as text frames. Subclasses
+    have to implement dumps and loads.
+    """
+    name = None
+    binary = False
+
+    def __repr__(self):
+        return "{}()".format(type(self).__name__)
+
+    @abc.abstractmethod
+    def dumps(self, obj):
+        """
+        Encodes the object into a message.
+
+        Arguments
+        ---------
+            obj: python object
+
+        Returns
+        -------
+            string or bytes if binary is True
+        """
+
+    @abc.abstractmethod
+    def loads(self, data):
+        """
+        Decodes a message into a python object.
+
+        Arguments
+        ---------
+            data: string or bytes
+
+        Returns
+        -------
+            python object
+        """
+
+
+class JsonCodec(Codec):
+    """
+    Codec which uses the json module of the standard library.
+    """
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    Codec which uses the orjson package. The produced messages are json
+    encoded strings, so they can be decoded by every other json codec.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson codec needs the package orjson.")
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(Codec):
+    """
+    Codec which uses the ujson package. The produced messages are json
+    encoded strings, so they can be decoded by every other json codec.
+    """
+    name = "ujson"
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("The ujson codec needs the package ujson.")
+
+    def dumps(self, obj):
+        return ujson.dumps(obj)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """
+    Codec which uses the msgpack package. The produced messages are bytes and
+    have to be send as binary frames.
+    """
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack codec needs the package msgpack.")
+
+    def dumps(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS = {
+    codec.name: codec
+    for codec in (JsonCodec, OrjsonCodec, UjsonCodec, MsgpackCodec)
+}
+"""
+Holds all codec classes by name.
+"""
+
+
+def get_codec(codec=None):
+    """
+    Returns a codec instance.
+
+    Arguments
+    ---------
+        codec: Codec instance, name of a codec or None for the json codec
+
+    Returns
+    -------
+        Codec
+
+    Except
+    ------
+        ValueError if the name is unknown
+        ImportError if the package of the codec is not installed
+    """
+    if codec is None:
+        return JsonCodec()
+
+    if isinstance(codec, Codec):
+        return codec
+
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError("Unknown codec `{}`.".format(codec))
+
+
+def available_codecs():
+    """
+    Returns the names of all codecs whose packages are installed.
+
+    Returns
+    -------
+        list of strings
+    """
+    available = []
+
+    for name, codec in CODECS.items():
+        try:
+            codec()
+        except ImportError:
+            continue
+        available.append(name)
+
+    return available
@@ -4,8 +4,9 @@ over a websocket
 """
 
 import json
-from uuid import uuid4
+from .ids import new_id
 from .rpc import ProtocolError
+from .typecheck import compile_schema
 
 __all__ = ["Command"]
 
@@ -21,17 +22,39 @@ class Command:
     ID_ARGUMENTS = 'arguments'
     ID_UUID = 'uuid'
 
+    FIELDS = (ID_METHOD, ID_ARGUMENTS, ID_UUID)
+    """
+    Holds the keys of the encoded command.
+    """
+
+    METHOD_CANCEL = '__cancel__'
+    """
+    Reserved method name of a command which cancels the command with the same
+    uuid.
+    """
+
+    VALIDATOR = compile_schema({
+        ID_METHOD: str,
+        ID_ARGUMENTS: dict,
+        ID_UUID: str
+    }, "command")
+    """
+    Checks the structure of a decoded command (see compile_schema).
+    """
+
+    __slots__ = ("__method", "__arguments", "__uuid")
+
     def __repr__(self):
         return str(self)
 
     def __str__(self):
-        return str(dict(self))
+        return str(self.to_dict())
 
     def __init__(self, method, uuid=None, **kwargs):
         self.__method = method
         self.__arguments = kwargs
         if uuid is None:
-            self.__uuid = uuid4().hex
+            self.__uuid = new_id()
         else:
             self.__uuid = uuid
 
@@ -39,9 +62,7 @@ class Command:
         return self.method == other.method and self.arguments == other.arguments
 
     def __iter__(self):
-        for key, val in vars(Command).items():
-            if isinstance(val, property):
-                yield (key, self.__getattribute__(key))
+        return iter(self.to_dict().items())
 
     @property
     def method(self):
@@ -88,6 +109,45 @@ class Command:
         """
         self.__uuid = uuid
 
+    @classmethod
+    def cancel(cls, uuid):
+        """
+        Creates a command which cancels the command with the given uuid.
+
+        Arguments
+        ---------
+            uuid: uuid of the command which is canceled
+
+        Returns
+        -------
+            A Command
+        """
+        return cls(cls.METHOD_CANCEL, uuid=uuid)
+
+    def is_cancel(self):
+        """
+        Checks if this command cancels another command.
+
+        Returns
+        -------
+            boolean
+        """
+        return self.__method == self.METHOD_CANCEL
+
+    def to_dict(self):
+        """
+        Formats the command into a dictionary which can be encoded.
+
+        Returns
+        -------
+            A dictionary with the keys in FIELDS.
+        """
+        return {
+            self.ID_METHOD: self.__method,
+            self.ID_ARGUMENTS: self.__arguments,
+            self.ID_UUID: self.__uuid,
+        }
+
     def to_json(self):
         """
         Formats the method into a json string.
@@ -96,10 +156,10 @@ class Command:
         -------
             A json string.
         """
-        return json.dumps(dict(self))
+        return json.dumps(self.to_dict())
 
     @classmethod
-    def from_json(cls, data):
+    def from_json(cls, data, schema=None):
         """
         Tries to parse a json object from the given data
         and tries to map the json entries to a valid command.
@@ -107,6 +167,28 @@ class Command:
         Attributes
         ----------
             data: a string which is json encoded
+            schema: compiled schema for the arguments (see compile_schema)
+
+        Returns
+        -------
+            A valid Command
+
+        Except
+        ------
+            ProtocolError when a key is not found or
+            an entire has a wrong type.
+        """
+        return cls.from_dict(json.loads(data), schema)
+
+    @classmethod
+    def from_dict(cls, json_data, schema=None):
+        """
+        Maps a decoded json object to a valid command.
+
+        Attributes
+        ----------
+            json_data: a dictionary
+            schema: compiled schema for the arguments (see compile_schema)
 
         Returns
         -------
@@ -117,22 +199,54 @@ class Command:
             ProtocolError when a key is not found or
             an entire has a wrong type.
         """
-        json_data = json.loads(data)
         try:
-            if not isinstance(json_data[cls.ID_ARGUMENTS], dict):
-                raise ProtocolError("Args has to be a dictionary.")
-
-            if not isinstance(json_data[cls.ID_METHOD], str):
-                raise ProtocolError("Method has to be a string.")
-
-            if not isinstance(json_data[cls.ID_UUID], str):
-                raise ProtocolError("UUID has to be a string.")
-
-            return cls(
-                method=json_data[cls.ID_METHOD],
-                uuid=json_data[cls.ID_UUID],
-                **json_data[cls.ID_ARGUMENTS])
-        except KeyError as err:
-            raise ProtocolError(
-                "The given json object has (a) missing key(s). ({})".format(
-                    err.args[0]))
+            cls.VALIDATOR(json_data)
+            if schema is not None:
+                schema(json_data[cls.ID_ARGUMENTS])
+        except TypeError as err:
+            raise ProtocolError(str(err))
+
+        return cls(
+            method=json_data[cls.ID_METHOD],
+            uuid=json_data[cls.ID_UUID],
+            **json_data[cls.ID_ARGUMENTS])
+
+    @staticmethod
+    def to_json_batch(commands):
+        """
+        Formats multiple commands into a json array.
+
+        Arguments
+        ---------
+            commands: iterable of Command
+
+        Returns
+        -------
+            A json string.
+        """
+        return json.dumps([command.to_dict() for command in commands])
+
+    @classmethod
+    def from_json_batch(cls, data):
+        """
+        Tries to parse a json array of commands from the given data.
+
+        Attributes
+        ----------
+            data: a string which is json encoded
+
+        Returns
+        -------
+            A list of valid Command
+
+        Except
+        ------
+            ProtocolError when the data is not an array or a command is
+            invalid.
+        """
+        json_data = json.loads(data)
+
+        if not isinstance(json_data, list):
+            raise ProtocolError("A batch has to be a json array.")
+
+        return [cls.from_dict(entry) for entry in json_data]
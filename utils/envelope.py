@@ -0,0 +1,249 @@
+"""
+This module contains the binary envelope which sends bytes without encoding
+them as text. An envelope is send as a binary websocket frame and consists of
+
+    4 bytes: length of the header (unsigned, big endian)
+    header: encoded by the codec, holds the message with None in place of
+        every bytes value and the path and length of every body
+    bodies: the raw bytes values, one after the other
+
+Bytes values are found in (nested) dictionaries of the message and in the
+dictionaries of a top level list (a batch). Values in other lists are not
+searched, so large listings do not slow down the search.
+
+A compressed envelope (see compress_envelope) has a header without message
+and a single body, which holds the zlib compressed frame.
+"""
+
+import struct
+import zlib
+
+from .codec import get_codec
+from .rpc import ProtocolError
+
+__all__ = [
+    "pack_envelope", "unpack_envelope", "has_bodies", "compress_envelope",
+    "is_envelope"
+]
+
+_BINARY = (bytes, bytearray, memoryview)
+
+_LENGTH = struct.Struct("!I")
+
+ID_MESSAGE = "message"
+ID_BODIES = "bodies"
+ID_COMPRESSION = "compression"
+ID_ENVELOPE = "envelope"
+
+COMPRESSION_ZLIB = "zlib"
+
+
+def _dict_has_bodies(obj):
+    """
+    Checks if a dictionary holds a bytes value.
+    """
+    for value in obj.values():
+        if isinstance(value, _BINARY):
+            return True
+        if isinstance(value, dict) and _dict_has_bodies(value):
+            return True
+    return False
+
+
+def has_bodies(message):
+    """
+    Checks if a message holds bytes values, which have to be send in an
+    envelope.
+
+    Arguments
+    ---------
+        message: dictionary or list of dictionaries
+
+    Returns
+    -------
+        boolean
+    """
+    if isinstance(message, dict):
+        return _dict_has_bodies(message)
+
+    if isinstance(message, list):
+        return any(
+            isinstance(item, dict) and _dict_has_bodies(item)
+            for item in message)
+
+    return False
+
+
+def _strip(obj, path, bodies):
+    """
+    Returns a copy of the dictionary without bytes values. The values and
+    their paths are appended to bodies.
+    """
+    stripped = dict()
+
+    for key, value in obj.items():
+        if isinstance(value, _BINARY):
+            bodies.append((path + [key], value))
+            stripped[key] = None
+        elif isinstance(value, dict):
+            stripped[key] = _strip(value, path + [key], bodies)
+        else:
+            stripped[key] = value
+
+    return stripped
+
+
+def pack_envelope(message, codec=None):
+    """
+    Packs a message with bytes values into an envelope. The bodies are only
+    copied once into the resulting frame.
+
+    Arguments
+    ---------
+        message: dictionary or list of dictionaries, which can hold bytes,
+            bytearray or memoryview values
+        codec: codec of the header (see utils.codec.get_codec)
+
+    Returns
+    -------
+        bytes
+    """
+    codec = get_codec(codec)
+    bodies = []
+
+    if isinstance(message, list):
+        message = [
+            _strip(item, [idx], bodies) if isinstance(item, dict) else item
+            for (idx, item) in enumerate(message)
+        ]
+    else:
+        message = _strip(message, [], bodies)
+
+    views = [memoryview(body) for (_, body) in bodies]
+    header = codec.dumps({
+        ID_MESSAGE: message,
+        ID_BODIES: [[path, view.nbytes]
+                    for ((path, _), view) in zip(bodies, views)],
+    })
+    if not codec.binary:
+        header = header.encode()
+
+    return b''.join([_LENGTH.pack(len(header)), header] + views)
+
+
+def compress_envelope(data, envelope=False, codec=None, level=-1):
+    """
+    Compresses an encoded message or an envelope with zlib and packs it into
+    a compressed envelope.
+
+    Arguments
+    ---------
+        data: string or bytes produced by the codec or bytes of an envelope
+        envelope: True if data is an envelope
+        codec: codec of the header (see utils.codec.get_codec)
+        level: zlib compression level from 0 to 9 or -1 for the default
+
+    Returns
+    -------
+        bytes
+    """
+    codec = get_codec(codec)
+
+    if isinstance(data, str):
+        data = data.encode()
+
+    header = codec.dumps({
+        ID_COMPRESSION: COMPRESSION_ZLIB,
+        ID_ENVELOPE: envelope,
+    })
+    if not codec.binary:
+        header = header.encode()
+
+    return b''.join(
+        [_LENGTH.pack(len(header)), header, zlib.compress(data, level)])
+
+
+def _decompress(header, body, codec):
+    """
+    Decompresses the body of a compressed envelope and decodes it.
+    """
+    if header[ID_COMPRESSION] != COMPRESSION_ZLIB:
+        raise ProtocolError("Unknown compression `{}`.".format(
+            header[ID_COMPRESSION]))
+
+    data = zlib.decompress(body)
+
+    if header[ID_ENVELOPE]:
+        return unpack_envelope(data, codec)
+    return codec.loads(data if codec.binary else data.decode())
+
+
+def is_envelope(data, codec=None):
+    """
+    Checks if a received message is an envelope. With a text codec every
+    binary frame is an envelope. A binary codec encodes dictionaries and
+    lists with a first byte other than 0, while the length of an envelope
+    header starts with 0 (headers are smaller than 16 MiB).
+
+    Arguments
+    ---------
+        data: string or bytes
+        codec: codec of the messages (see utils.codec.get_codec)
+
+    Returns
+    -------
+        boolean
+    """
+    if not isinstance(data, bytes):
+        return False
+    return not get_codec(codec).binary or data[:1] == b'\x00'
+
+
+def unpack_envelope(data, codec=None):
+    """
+    Unpacks an envelope. The bodies are memoryview objects of data, so they
+    are not copied. A compressed envelope is decompressed first.
+
+    Arguments
+    ---------
+        data: bytes of a binary frame
+        codec: codec of the header (see utils.codec.get_codec)
+
+    Returns
+    -------
+        dictionary or list of dictionaries
+
+    Except
+    ------
+        ProtocolError if data is no valid envelope
+    """
+    codec = get_codec(codec)
+    view = memoryview(data)
+
+    try:
+        (length, ) = _LENGTH.unpack_from(view)
+        offset = _LENGTH.size + length
+
+        header = bytes(view[_LENGTH.size:offset])
+        header = codec.loads(header if codec.binary else header.decode())
+
+        if ID_COMPRESSION in header:
+            return _decompress(header, view[offset:], codec)
+
+        message = header[ID_MESSAGE]
+
+        for path, size in header[ID_BODIES]:
+            target = message
+            for key in path[:-1]:
+                target = target[key]
+
+            if offset + size > len(view):
+                raise ProtocolError("The envelope is truncated.")
+
+            target[path[-1]] = view[offset:offset + size]
+            offset += size
+    except (struct.error, zlib.error, UnicodeDecodeError, ValueError,
+            KeyError, IndexError, TypeError) as err:
+        raise ProtocolError("Invalid binary envelope. ({})".format(err))
+
+    return message
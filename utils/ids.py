@@ -0,0 +1,90 @@
+"""
+This module contains the generation of identifiers for commands and statuses.
+"""
+
+import os
+import weakref
+from itertools import count
+from uuid import uuid4
+
+__all__ = ["IdGenerator", "new_id", "set_id_generator"]
+
+
+class IdGenerator:
+    """
+    Generates unique identifiers with the same format as uuid4().hex (32
+    hex characters). Every process draws one random prefix and appends a
+    counter, so only the first identifier needs random bytes from the
+    operating system. A forked process draws a new prefix. If the platform
+    supports os.register_at_fork the prefix is drawn by a fork hook, otherwise
+    the process id is compared on every call.
+    """
+
+    def __init__(self):
+        self._pid = None
+        self._prefix = None
+        self._counter = None
+        self.reset()
+
+        if _AT_FORK:
+            _GENERATORS.add(self)
+
+    def reset(self):
+        """
+        Draws a new random prefix and restarts the counter.
+        """
+        self._pid = None if _AT_FORK else os.getpid()
+        self._prefix = uuid4().hex[:16]
+        self._counter = count()
+
+    def __call__(self):
+        if self._pid is not None and self._pid != os.getpid():
+            self.reset()
+        return "{}{:016x}".format(self._prefix, next(self._counter))
+
+
+_AT_FORK = hasattr(os, 'register_at_fork')
+
+_GENERATORS = weakref.WeakSet()
+"""
+Holds all generators which are reset in a forked process.
+"""
+
+
+def _reset_after_fork():
+    """
+    Resets all generators in a forked process.
+    """
+    for generator in list(_GENERATORS):
+        generator.reset()
+
+
+if _AT_FORK:
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_GENERATOR = IdGenerator()
+
+
+def new_id():
+    """
+    Returns a new identifier from the current generator.
+
+    Returns
+    -------
+        string
+    """
+    return _GENERATOR()
+
+
+def set_id_generator(generator):
+    """
+    Replaces the generator which is used by new_id(). For example
+    set_id_generator(lambda: uuid4().hex) restores random identifiers.
+
+    Arguments
+    ---------
+        generator: function without arguments which returns a string
+    """
+    global _GENERATOR  # pylint: disable=W0603
+    _GENERATOR = generator
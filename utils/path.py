@@ -1,7 +1,16 @@
 """
 Functions for path modification.
 """
-from utils.typecheck import ensure_type
+import re
+from collections.abc import Iterator
+
+from utils.typecheck import ensure_type, ensure_type_array
+
+_SEPARATORS = ('\\', '/')
+
+_NETWORK_PREFIXES = ('\\\\', '//', '\\/', '/\\')
+
+_REPEATED_SEPARATORS = re.compile(r'[\\/]+')
 
 
 def remove_trailing_path_seperator(path):
@@ -22,3 +31,101 @@ def remove_trailing_path_seperator(path):
         return path[:-1]
     else:
         return path
+
+
+def _as_list(name, paths):
+    """
+    Checks the types of all paths at once.
+
+    Arguments
+    ---------
+        name: variable name
+        paths: list, tuple or iterator of strings
+
+    Returns
+    -------
+        list or tuple of strings
+    """
+    if isinstance(paths, Iterator):
+        paths = list(paths)
+
+    ensure_type_array(name, paths, str)
+    return paths
+
+
+def remove_trailing_path_seperators(paths):
+    """
+    Removes the last character of every path which ends with a path
+    seperator. The types are checked once for all paths.
+
+    Arguments
+    ----------
+        paths: list, tuple or iterator of strings
+
+    Returns
+    -------
+        list of strings
+    """
+    return [
+        path[:-1] if path[-1:] in _SEPARATORS else path
+        for path in _as_list("paths", paths)
+    ]
+
+
+def _normalize_path(path, sep):
+    """
+    Normalizes a path without checking its type (see normalize_path).
+    """
+    prefix = ''
+    if path[:2] in _NETWORK_PREFIXES and path[2:3] not in ('', '\\', '/'):
+        prefix = sep
+        path = path[1:]
+
+    path = _REPEATED_SEPARATORS.sub(sep.replace('\\', '\\\\'), path)
+
+    if path[-1:] == sep:
+        stripped = path.rstrip(sep)
+        if stripped and stripped[-1] != ':':
+            path = stripped
+        else:
+            path = stripped + sep
+
+    return prefix + path
+
+
+def normalize_path(path, sep='/'):
+    """
+    Replaces all path seperators (\\ and /) with sep, joins repeated
+    seperators and removes trailing seperators. The root (/), the root of a
+    drive (C:/) and the two leading seperators of a network path
+    (//server/share) are kept.
+
+    Arguments
+    ----------
+        path: string
+        sep: seperator of the normalized path
+
+    Returns
+    -------
+        string
+    """
+    ensure_type("path", path, str)
+
+    return _normalize_path(path, sep)
+
+
+def normalize_paths(paths, sep='/'):
+    """
+    Normalizes all paths (see normalize_path). The types are checked once for
+    all paths.
+
+    Arguments
+    ----------
+        paths: list, tuple or iterator of strings
+        sep: seperator of the normalized paths
+
+    Returns
+    -------
+        list of strings
+    """
+    return [_normalize_path(path, sep) for path in _as_list("paths", paths)]
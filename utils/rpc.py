@@ -4,7 +4,19 @@ rpc via websockets. The command executor is a
 client which listens on the websocket.
 """
 
-__all__ = ["ProtocolError", "Rpc"]
+import asyncio
+import inspect
+import json
+import types
+from collections import OrderedDict
+
+from .cache import LruCache
+from .typecheck import type_checker
+
+__all__ = ["ProtocolError", "Rpc", "RpcMethod", "RpcNamespace"]
+
+_isasyncgenfunction = getattr(inspect, 'isasyncgenfunction',
+                              lambda func: False)
 
 
 class ProtocolError(Exception):
@@ -13,33 +25,456 @@ class ProtocolError(Exception):
     """
 
 
-def method_wrapper(method_list):
+def compile_validator(func):
     """
-    Takes a static argument and returns
-    a function which uses this static
-    argument.
+    Builds a function which checks the arguments of a call against the
+    signature of func. Parameters with a type annotation are checked with
+    a type_checker, a float parameter accepts integers as well. A bytes
+    parameter accepts bytearray and memoryview values, because the bytes of
+    a binary envelope are received as memoryview (see utils.envelope).
+
+    Arguments
+    ---------
+        func: function
 
     Returns
     -------
-        A wrapped function which uses a static
-        argument, without handing it manually.
+        A function which takes a dictionary of arguments and raises a
+        TypeError if they do not match.
     """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return lambda arguments: None
+
+    required = []
+    known = []
+    checkers = []
+    var_keyword = False
+
+    for param in parameters:
+        if param.kind == param.VAR_KEYWORD:
+            var_keyword = True
+        elif param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY):
+            known.append(param.name)
+
+            if param.default is param.empty:
+                required.append(param.name)
+
+            if param.annotation is not param.empty and isinstance(
+                    param.annotation, type):
+                if param.annotation is float:
+                    checker = type_checker(param.name, float, int)
+                elif param.annotation is bytes:
+                    checker = type_checker(param.name, bytes, bytearray,
+                                           memoryview)
+                else:
+                    checker = type_checker(param.name, param.annotation)
+                checkers.append((param.name, checker))
+
+    required = frozenset(required)
+    known = frozenset(known)
+    name = func.__name__
+
+    def validate(arguments):
+        """
+        Checks the arguments of a call.
+        """
+        missing = required.difference(arguments)
+        if missing:
+            raise TypeError("{}() missing argument(s): {}".format(
+                name, ', '.join(sorted(missing))))
+
+        if not var_keyword:
+            unknown = set(arguments).difference(known)
+            if unknown:
+                raise TypeError("{}() got unknown argument(s): {}".format(
+                    name, ', '.join(sorted(unknown))))
+
+        for arg, checker in checkers:
+            if arg in arguments:
+                checker(arguments[arg])
+
+    return validate
+
+
+class RpcMethod:
+    """
+    Represents a registered RPC function. The kind of the function and a
+    validator for its arguments are determined once, so the caller does not
+    have to inspect the function on every call.
+
+    An async generator function is a stream method. Every yielded chunk is
+    send to the caller as soon as it is produced.
+
+    Arguments
+    ---------
+        func: function, coroutine function, generator function or async
+            generator function
+        execution: where the function is executed, one of EXECUTION_INLINE
+            (on the event loop), EXECUTION_THREAD (thread pool) or
+            EXECUTION_PROCESS (process pool). Only plain functions can be
+            executed in a pool.
+        max_in_flight: maximal number of calls which are executed at the same
+            time (default: unlimited)
+        cache_size: if greater than 0 the results are memoized by their
+            arguments in a LruCache with cache_size entries. Concurrent calls
+            with the same arguments are executed once. Only use this for
+            functions without side effects. Stream methods can not be
+            memoized. (default: 0)
+        cache_ttl: lifetime of a memoized result in seconds or None
+    """
+
+    KIND_FUNCTION = 'function'
+    KIND_COROUTINE = 'coroutine'
+    KIND_GENERATOR = 'generator'
+    KIND_STREAM = 'stream'
+
+    EXECUTION_INLINE = 'inline'
+    EXECUTION_THREAD = 'thread'
+    EXECUTION_PROCESS = 'process'
+
+    def __init__(self,
+                 func,
+                 execution=EXECUTION_INLINE,
+                 max_in_flight=None,
+                 cache_size=0,
+                 cache_ttl=None):
+        self._func = func
+        self._execution = execution
+        self._max_in_flight = max_in_flight
+        self._results = LruCache(cache_size, cache_ttl) if cache_size else None
+        self._calls = dict()
+        self._validate = compile_validator(func)
+
+        if asyncio.iscoroutinefunction(func):
+            self._kind = self.KIND_COROUTINE
+            self._call = func
+        elif inspect.isgeneratorfunction(func):
+            self._kind = self.KIND_GENERATOR
+            self._call = types.coroutine(func)
+        elif _isasyncgenfunction(func):
+            self._kind = self.KIND_STREAM
+            self._call = func
+        else:
+            self._kind = self.KIND_FUNCTION
+            self._call = func
+
+        if execution not in (self.EXECUTION_INLINE, self.EXECUTION_THREAD,
+                             self.EXECUTION_PROCESS):
+            raise ValueError("Unknown execution `{}`.".format(execution))
+
+        if (execution != self.EXECUTION_INLINE
+                and self.kind != self.KIND_FUNCTION):
+            raise ValueError(
+                "Only plain functions can be executed in a pool.")
+
+        if cache_size and self.is_stream:
+            raise ValueError("Stream methods can not be memoized.")
+
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight has to be at least 1.")
+
+    def __repr__(self):
+        return "RpcMethod({}, {})".format(self.name, self.kind)
+
+    def validate(self, arguments):
+        """
+        Checks if the function can be called with the arguments.
+
+        Arguments
+        ---------
+            arguments: dictionary of arguments
+
+        Except
+        ------
+            TypeError if an argument is missing, unknown or has a wrong type
+        """
+        self._validate(arguments)
+
+    @staticmethod
+    def cache_key(arguments):
+        """
+        Returns a hashable key for the arguments of a call. The key is built
+        from a canonical json encoding, so dictionaries with a different key
+        order have the same key. Bytes, bytearray and memoryview values are
+        compared by their content.
+
+        Arguments
+        ---------
+            arguments: dictionary of arguments
+
+        Returns
+        -------
+            tuple or None if an argument is neither a json value nor bytes,
+            so the call can not be memoized
+        """
+        blobs = []
+
+        def default(value):
+            """
+            Replaces a bytes value with a reference to its content.
+            """
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                blobs.append(bytes(value))
+                return {"\0bytes": len(blobs) - 1}
+            raise TypeError()
+
+        try:
+            text = json.dumps(arguments, sort_keys=True, default=default)
+        except (TypeError, ValueError):
+            return None
+
+        return (text, tuple(blobs))
+
+    @property
+    def name(self):
+        """
+        Returns the name which is used to dispatch the function.
 
-    def method_decorator(func):
+        Returns
+        -------
+            string
         """
-        A wrapper function for method. Which
-        appends the new functions to the internal
-        list.
+        return self._func.__name__
+
+    @property
+    def func(self):
         """
-        for fun in method_list:
-            if fun.__name__ == func.__name__:
-                raise ValueError(
-                    "Only functions with unique names are allowed.")
+        Returns the registered function.
 
-        method_list.append(func)
+        Returns
+        -------
+            function
+        """
+        return self._func
+
+    @property
+    def kind(self):
+        """
+        Returns the kind of the registered function.
+
+        Returns
+        -------
+            One of KIND_FUNCTION, KIND_COROUTINE, KIND_GENERATOR or KIND_STREAM
+        """
+        return self._kind
+
+    @property
+    def execution(self):
+        """
+        Returns where the function is executed.
+
+        Returns
+        -------
+            One of EXECUTION_INLINE, EXECUTION_THREAD or EXECUTION_PROCESS
+        """
+        return self._execution
+
+    @property
+    def max_in_flight(self):
+        """
+        Returns the maximal number of calls which are executed at the same
+        time.
+
+        Returns
+        -------
+            int or None if unlimited
+        """
+        return self._max_in_flight
+
+    @property
+    def results(self):
+        """
+        Returns the cache of memoized results.
+
+        Returns
+        -------
+            LruCache or None if the results are not memoized
+        """
+        return self._results
+
+    @property
+    def calls(self):
+        """
+        Returns the running calls of a memoized function by their cache key.
+        The caller stores a future which is done after the call finished.
+
+        Returns
+        -------
+            dictionary
+        """
+        return self._calls
+
+    @property
+    def is_async(self):
+        """
+        Checks if the result of call(...) has to be awaited.
+
+        Returns
+        -------
+            boolean
+        """
+        return self._kind in (self.KIND_COROUTINE, self.KIND_GENERATOR)
+
+    @property
+    def is_stream(self):
+        """
+        Checks if call(...) returns an async generator whose chunks are send
+        one by one.
+
+        Returns
+        -------
+            boolean
+        """
+        return self._kind == self.KIND_STREAM
+
+    @property
+    def call(self):
+        """
+        Returns the adapter which calls the function. If is_async is True the
+        adapter returns a coroutine, if is_stream is True an async generator,
+        otherwise the result of the function.
+
+        Returns
+        -------
+            function
+        """
+        return self._call
+
+
+class RpcNamespace:
+    """
+    Represents a set of RPC methods which is independent from all other sets.
+    Every namespace owns its methods. On first use the methods are compiled
+    into a read only dispatch table, which is rebuild after the set of methods
+    changed.
+    """
+
+    def __init__(self, name=None):
+        self._name = name
+        self.methods = OrderedDict()
+        self._table = None
+
+    @property
+    def name(self):
+        """
+        Returns the name of this namespace.
+
+        Returns
+        -------
+            string or None for the default namespace
+        """
+        return self._name
+
+    def method(self, func=None, **options):
+        """
+        A decorator which adds the function to this namespace. The decorator
+        can be used with arguments (@method(execution=...)) or without
+        (@method).
+
+        Arguments
+        ---------
+            func: A function with a unique name
+            **options: execution, max_in_flight, cache_size and cache_ttl
+                (see RpcMethod)
+
+        Returns
+        -------
+            The unmodified function
+
+        Except
+        ------
+            ValueError if a function with the same name exists
+        """
+        if func is None:
+            return lambda func: self.method(func, **options)
+
+        if func.__name__ in self.methods:
+            raise ValueError("Only functions with unique names are allowed.")
+
+        self.methods[func.__name__] = RpcMethod(func, **options)
+        self._table = None
         return func
 
-    return method_decorator
+    def compile(self):
+        """
+        Builds the dispatch table for the current set of methods.
+
+        Returns
+        -------
+            A read only mapping from function names to RpcMethod.
+        """
+        self._table = types.MappingProxyType(dict(self.methods))
+        return self._table
+
+    @property
+    def table(self):
+        """
+        Returns the dispatch table of this namespace. The table is compiled if
+        it does not exist.
+
+        Returns
+        -------
+            A read only mapping from function names to RpcMethod.
+        """
+        table = self._table
+        if table is None:
+            table = self.compile()
+        return table
+
+    def lookup(self, func):
+        """
+        Searches for a registered function in the dispatch table.
+
+        Attributes
+        ----------
+            func: A function identifier
+
+        Returns
+        -------
+            A RpcMethod if a function with the given name was found.
+
+        Except
+        ------
+            ProtocolError the function is unknown
+        """
+        try:
+            return self.table[func]
+        except KeyError:
+            raise ProtocolError("unknown function '{}'".format(func))
+
+    def get(self, func):
+        """
+        Searches for a function in the dispatch table.
+
+        Attributes
+        ----------
+            func: A function identifier
+
+        Returns
+        -------
+            A function handle if  a function with the given name
+            was found.
+
+        Except
+        ------
+            ProtocolError the function is unknown
+        """
+        return self.lookup(func).func
+
+    def __iter__(self):
+        return (method.func for method in self.methods.values())
+
+    def __len__(self):
+        return len(self.methods)
+
+    def clear(self):
+        """
+        Removes all element in this namespace.
+        """
+        self.methods.clear()
+        self._table = None
 
 
 class Rpc:
@@ -47,14 +482,19 @@ class Rpc:
     Represents a class which collects all
     RPC methods. Afterwards this class can
     be used to dispatch functions dynamic.
+    The static functions use the default
+    namespace, other namespaces can be
+    obtained with Rpc.namespace(...).
     """
-    methods = []
-    method = method_wrapper(methods)
+    default = RpcNamespace()
+    namespaces = {}
+    methods = default.methods
+    method = default.method
 
     @staticmethod
     def get(func):
         """
-        Searches for a function in the internal list.
+        Searches for a function in the default namespace.
 
         Attributes
         ----------
@@ -69,18 +509,54 @@ class Rpc:
         ------
             ProtocolError the function is unknown
         """
-        for method in Rpc.methods:
-            if method.__name__ == func:
-                return method
+        return Rpc.default.get(func)
+
+    @staticmethod
+    def lookup(func):
+        """
+        Searches for a registered function in the default namespace.
+
+        Attributes
+        ----------
+            func: A function identifier
+
+        Returns
+        -------
+            A RpcMethod if a function with the given name was found.
+
+        Except
+        ------
+            ProtocolError the function is unknown
+        """
+        return Rpc.default.lookup(func)
+
+    @staticmethod
+    def namespace(name):
+        """
+        Returns the namespace with the given name. If the namespace does not
+        exist a new one is created.
+
+        Arguments
+        ---------
+            name: string
 
-        raise ProtocolError("unknown function '{}'".format(func))
+        Returns
+        -------
+            RpcNamespace
+        """
+        try:
+            return Rpc.namespaces[name]
+        except KeyError:
+            namespace = RpcNamespace(name)
+            Rpc.namespaces[name] = namespace
+            return namespace
 
     def __iter__(self):
-        return self.methods.__iter__()
+        return iter(Rpc.default)
 
     @staticmethod
     def clear():
         """
-        Removes all element in the method list.
+        Removes all element in the default namespace.
         """
-        Rpc.methods.clear()
+        Rpc.default.clear()
@@ -6,7 +6,7 @@ __all__ = []
 
 try:
     from . import rpc_websockets
-    from .rpc_websockets import RpcReceiver
+    from .rpc_websockets import RpcReceiver, install_uvloop
     __all__.extend(rpc_websockets.__all__)
 except ImportError:
     pass
@@ -3,13 +3,257 @@ This module holds all classes which depends on websockets. Since websockets is a
 optional dependency.
 """
 import asyncio
+import hashlib
+import importlib
 import logging
+import multiprocessing
+import os
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 
 import websockets
+from websockets.extensions.permessage_deflate import \
+    ClientPerMessageDeflateFactory
 
-__all__ = ["RpcReceiver"]
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-from utils import Command, Rpc, Status
+__all__ = ["RpcReceiver", "install_uvloop"]
+
+from utils import Command, ProtocolError, Rpc, RpcMethod, Status
+from utils.cache import LruCache
+from utils.codec import Codec, get_codec
+from utils.envelope import (compress_envelope, has_bodies, is_envelope,
+                            pack_envelope, unpack_envelope)
+
+# blake2b needs Python 3.6
+_shard_hash = (partial(hashlib.blake2b, digest_size=8)
+               if hasattr(hashlib, 'blake2b') else hashlib.md5)
+
+EVENT_RECEIVED = 'received'
+EVENT_FINISHED = 'finished'
+EVENT_FLUSH = 'flush'
+EVENT_CONNECTED = 'connected'
+EVENT_PARTIAL = 'partial'
+
+
+def install_uvloop():
+    """
+    Uses the event loop of uvloop for all event loops which are created
+    afterwards, if the package uvloop is installed. Otherwise the event loop
+    of asyncio is kept. Call this before the event loop is created.
+
+    Returns
+    -------
+        True if uvloop is used
+    """
+    if uvloop is None:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class Truncated:
+    """
+    Wraps an object for logging. The object is only formatted if the log
+    record is emitted and the text is cut after a maximal length.
+
+    Arguments
+    ---------
+        obj: python object
+        limit: maximal number of characters or None for no limit
+    """
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj, limit):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self):
+        text = str(self.obj)
+        if self.limit is not None and len(text) > self.limit:
+            return "{}... ({} characters)".format(text[:self.limit],
+                                                 len(text))
+        return text
+
+
+def _close_code(err):
+    """
+    Returns the close code of a ConnectionClosed error. Newer versions of
+    websockets hold the received close frame instead of the code.
+    """
+    rcvd = getattr(err, 'rcvd', None)
+    if rcvd is not None:
+        return rcvd.code
+    return getattr(err, 'code', None)
+
+
+def _invalid_command(entry, err):
+    """
+    Returns the error status of a received entry which is no valid command.
+    The uuid of the entry is used if it has one.
+    """
+    uuid = method = None
+    if isinstance(entry, dict):
+        uuid = entry.get(Command.ID_UUID)
+        method = entry.get(Command.ID_METHOD)
+
+    return Status(Status.ID_ERR, {
+        'method': method if isinstance(method, str) else None,
+        'result': str(err)
+    }, uuid if isinstance(uuid, str) else None)
+
+
+def _copy_views(message):
+    """
+    Returns the message with bytes in place of memoryview values, which can
+    not be pickled. Like envelopes only dictionaries and a top level list
+    are searched.
+    """
+    if not has_bodies(message):
+        return message
+
+    def copy(obj):
+        """
+        Copies a dictionary and its memoryview values.
+        """
+        return {
+            key: bytes(value) if isinstance(value, memoryview) else
+            copy(value) if isinstance(value, dict) else value
+            for (key, value) in obj.items()
+        }
+
+    if isinstance(message, list):
+        return [
+            copy(item) if isinstance(item, dict) else item for item in message
+        ]
+    return copy(message)
+
+
+class _ObjectCodec(Codec):
+    """
+    Codec of the worker processes of a sharded receiver. The messages are
+    send as python objects through a pipe, so they are not encoded.
+    """
+    name = "object"
+    binary = True
+
+    def dumps(self, obj):
+        return _copy_views(obj)
+
+    def loads(self, data):
+        return data
+
+
+class _PipeClosed(Exception):
+    """
+    Raised by the session of a worker process when the pipe to the front
+    process was closed.
+    """
+
+
+class _PipeSession:
+    """
+    Represents the session of a worker process of a sharded receiver, which
+    exchanges the messages with the front process through a pipe. The pipe is
+    read in a thread, so the event loop is never blocked by a read.
+
+    Arguments
+    ---------
+        pipe: multiprocessing.connection.Connection
+        loop: event loop of the worker process
+    """
+
+    def __init__(self, pipe, loop):
+        self._pipe = pipe
+        self._messages = asyncio.Queue()
+        threading.Thread(
+            target=_read_pipe,
+            args=(pipe, loop, self._messages.put_nowait),
+            daemon=True).start()
+
+    async def recv(self):
+        """
+        Returns the next message from the front process.
+        """
+        message = await self._messages.get()
+        if message is None:
+            raise _PipeClosed()
+        return message
+
+    async def send(self, data):
+        """
+        Sends a message to the front process.
+        """
+        try:
+            self._pipe.send(data)
+        except OSError:
+            raise _PipeClosed()
+
+    async def close(self):
+        """
+        Closes the pipe.
+        """
+        self._pipe.close()
+
+
+def _read_pipe(pipe, loop, callback):
+    """
+    Reads messages from a pipe until it is closed and passes them to the
+    callback on the event loop. None is passed after the pipe was closed.
+    """
+    while True:
+        try:
+            message = pipe.recv()
+        except (EOFError, OSError):
+            message = None
+
+        try:
+            loop.call_soon_threadsafe(callback, message)
+        except RuntimeError:
+            # the event loop is closed
+            return
+
+        if message is None:
+            return
+
+
+def _run_worker(pipe, namespace, modules, options):
+    """
+    Runs a worker process of a sharded receiver until the pipe is closed.
+
+    Arguments
+    ---------
+        pipe: multiprocessing.connection.Connection to the front process
+        namespace: name of the namespace (see Rpc.namespace) or None for
+            Rpc.default
+        modules: names of the modules which register the methods
+        options: arguments of the RpcReceiver of the worker
+    """
+    for module in modules:
+        importlib.import_module(module)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    rpc = Rpc.default if namespace is None else Rpc.namespace(namespace)
+    receiver = _WorkerReceiver(pipe, rpc=rpc, **options)
+
+    try:
+        loop.run_until_complete(receiver.run())
+    except _PipeClosed:
+        logging.debug("The front process closed the pipe.")
+    finally:
+        receiver.close()
+        loop.close()
 
 
 class RpcReceiver:
@@ -21,12 +265,194 @@ class RpcReceiver:
     two websockets connection. One connection connects to producer. This
     connection receives all commands and adds them to event loop. The other
     connection send the result of the execution. This means it acts as producer.
+
+    Methods which are registered with a thread or process execution are
+    executed in a pool, so they do not block the event loop. The pools are
+    created on first use.
+
+    Results which hold bytes, bytearray or memoryview values are send as
+    binary frames in an envelope (see utils.envelope) if the codec produces
+    text. Received binary frames are unpacked the same way, so their bytes
+    values are memoryview objects.
+
+    Every chunk of a stream method (an async generator function) is send as
+    Status.ok({'method': ..., 'result': chunk, 'partial': True}) with the
+    uuid of the command. The next chunk is requested after the previous one
+    was written to the websocket, so a stream never buffers more than one
+    chunk and waits while there is no session. Partial results are send
+    without waiting for a batch. The final
+    Status holds the number of chunks as result or the error which ended
+    the stream.
+
+    Arguments
+    ---------
+        url: websocket URL
+        rpc: namespace which holds the callable methods (default: Rpc.default)
+        thread_pool_size: number of threads for EXECUTION_THREAD methods
+            (default: 5 * number of CPUs)
+        process_pool_size: number of processes for EXECUTION_PROCESS methods
+            (default: number of CPUs)
+        max_in_flight: maximal number of commands which are executed at the
+            same time (default: unlimited)
+        max_pending: maximal number of received commands which wait for
+            their execution. If the limit is reached, no further commands are
+            read from the websocket until a command finished. A batch of
+            commands is always queued entirely. (default: 0)
+        batch_size: if set, results are collected and send as one json array
+            (see Status.to_json_batch) as soon as batch_size results are
+            collected or batch_delay seconds passed since the first result.
+            (default: every result is send in its own message)
+        batch_delay: maximal delay of a collected result in seconds
+        codec: Codec instance or name of the codec which encodes the messages
+            (see utils.codec, default: json)
+        log_limit: maximal number of characters of arguments and results in
+            log messages or None for no limit (default: 200)
+        reconnect: if True, a lost session is reopened while the running
+            commands continue. Their results are kept in the outbox and send
+            after the reconnect. A session which is closed normally (code
+            1000) ends run(). (default: False)
+        reconnect_delay: delay before the first reconnect attempt in seconds,
+            which doubles with every failed attempt
+        reconnect_max_delay: maximal delay between two attempts in seconds
+        outbox_size: maximal number of results which are kept without a
+            session or None for no limit. If the outbox is full the oldest
+            result is dropped. (default: 1000)
+        result_cache_size: number of finished results which are kept by
+            uuid. A command whose uuid is in the cache is answered with the
+            cached result instead of being executed again. (default: 0, no
+            cache)
+        result_cache_ttl: lifetime of a cached result in seconds or None
+        cancel_on_duplicate: if True, a command with the uuid of a running or
+            queued command cancels it (the behaviour of older versions).
+            Otherwise the duplicate is ignored and only Command.cancel(...)
+            cancels commands. (default: False)
+        compression: 'deflate' to negotiate the permessage-deflate extension
+            of websockets, which compresses every message, or None
+            (default: 'deflate')
+        compression_options: dictionary with the settings of the
+            permessage-deflate extension (see
+            websockets.extensions.permessage_deflate.
+            ClientPerMessageDeflateFactory), for example
+            {'client_max_window_bits': 10, 'compress_settings':
+            {'memLevel': 4}} (default: the settings of websockets)
+        compress_threshold: if set, messages with at least this number of
+            characters or bytes are compressed with zlib and send in a
+            compressed envelope (see utils.envelope.compress_envelope), while
+            smaller messages are send unchanged. Use it together with
+            compression=None. (default: None, no compression)
+        compress_level: zlib compression level from 0 to 9 or -1 for the
+            default
+        workers: if set, the receiver runs in sharded mode. This process
+            only owns the websocket, while the commands are executed by
+            this number of worker processes. Every worker runs its own event
+            loop with the same namespace, which has to be Rpc.default or a
+            namespace of Rpc.namespace(...). The commands are distributed by
+            their uuid, so duplicates and cancel commands reach the worker
+            which executes the command. The limits, the batching and the
+            result cache apply to every worker on its own. Reconnecting is
+            not supported in sharded mode.
+            (default: None, commands are executed in this process)
+        worker_modules: names of modules which are imported by every worker
+            before it receives commands. Workers which are not forked (for
+            example on Windows) start with an empty namespace, so the methods
+            have to be registered when these modules are imported.
+        worker_start_method: start method of the worker processes ('fork',
+            'spawn' or 'forkserver', see multiprocessing.get_context)
+            (default: None, the default start method of multiprocessing)
     """
 
-    def __init__(self, url):
+    def __init__(self,
+                 url,
+                 rpc=None,
+                 thread_pool_size=None,
+                 process_pool_size=None,
+                 max_in_flight=None,
+                 max_pending=0,
+                 batch_size=None,
+                 batch_delay=0.01,
+                 codec=None,
+                 log_limit=200,
+                 reconnect=False,
+                 reconnect_delay=0.5,
+                 reconnect_max_delay=30,
+                 outbox_size=1000,
+                 result_cache_size=0,
+                 result_cache_ttl=60,
+                 cancel_on_duplicate=False,
+                 compression='deflate',
+                 compression_options=None,
+                 compress_threshold=None,
+                 compress_level=-1,
+                 workers=None,
+                 worker_modules=None,
+                 worker_start_method=None):
         self._url = url
+        self._rpc = Rpc.default if rpc is None else rpc
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.codec = get_codec(codec)
+        self.log_limit = log_limit
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.outbox_size = outbox_size
+        self.cancel_on_duplicate = cancel_on_duplicate
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+        self.connect_options = {'compression': compression}
+        if compression == 'deflate' and compression_options is not None:
+            self.connect_options['extensions'] = [
+                ClientPerMessageDeflateFactory(**compression_options)
+            ]
+
+        if result_cache_size > 0:
+            self._results = LruCache(result_cache_size, result_cache_ttl)
+        else:
+            self._results = None
 
-        self._connection = websockets.connect(self.url)
+        cpu_count = os.cpu_count() or 1
+        self._pool_sizes = {
+            RpcMethod.EXECUTION_THREAD:
+            5 * cpu_count if thread_pool_size is None else thread_pool_size,
+            RpcMethod.EXECUTION_PROCESS:
+            cpu_count if process_pool_size is None else process_pool_size,
+        }
+        self._executors = dict()
+
+        self._worker_options = {
+            'thread_pool_size': thread_pool_size,
+            'process_pool_size': process_pool_size,
+            'max_in_flight': max_in_flight,
+            'max_pending': max_pending,
+            'batch_size': batch_size,
+            'batch_delay': batch_delay,
+            'log_limit': log_limit,
+            'outbox_size': outbox_size,
+            'result_cache_size': result_cache_size,
+            'result_cache_ttl': result_cache_ttl,
+            'cancel_on_duplicate': cancel_on_duplicate,
+        }
+        self._worker_modules = list(worker_modules or [])
+        self._worker_context = multiprocessing.get_context(worker_start_method)
+        self._processes = []
+
+        if workers is not None:
+            if workers < 1:
+                raise ValueError("workers has to be at least 1.")
+            if reconnect:
+                raise ValueError(
+                    "Reconnecting is not supported in sharded mode.")
+            if (self.rpc is not Rpc.default
+                    and Rpc.namespaces.get(self.rpc.name) is not self.rpc):
+                raise ValueError(
+                    "Sharded mode needs Rpc.default or a namespace of "
+                    "Rpc.namespace(...).")
+
+        self._connection = self.create_connection()
         self._session = None
         self.closed = False
 
@@ -41,6 +467,17 @@ class RpcReceiver:
         """
         return self._url
 
+    @property
+    def rpc(self):
+        """
+        Returns the namespace which is used to dispatch the commands.
+
+        Returns
+        -------
+            RpcNamespace
+        """
+        return self._rpc
+
     @property
     def connection(self):
         """
@@ -63,94 +500,774 @@ class RpcReceiver:
         """
         return self._session
 
+    def create_connection(self):
+        """
+        Creates a new connection with the compression settings.
+
+        Returns
+        -------
+            websocket.Connect
+        """
+        return websockets.connect(self.url, **self.connect_options)
+
+    def executor(self, execution):
+        """
+        Returns the pool for the given execution. The pool is created if it
+        does not exist.
+
+        Arguments
+        ---------
+            execution: RpcMethod.EXECUTION_THREAD or
+                RpcMethod.EXECUTION_PROCESS
+
+        Returns
+        -------
+            concurrent.futures.Executor
+        """
+        try:
+            return self._executors[execution]
+        except KeyError:
+            if execution == RpcMethod.EXECUTION_THREAD:
+                pool = ThreadPoolExecutor(self._pool_sizes[execution])
+            else:
+                pool = ProcessPoolExecutor(self._pool_sizes[execution])
+            self._executors[execution] = pool
+            return pool
+
+    def encode(self, message):
+        """
+        Encodes a message with the codec. A message with bytes values is
+        packed into an envelope if the codec produces text. Messages which
+        reach compress_threshold are compressed.
+
+        Arguments
+        ---------
+            message: dictionary or list of dictionaries
+
+        Returns
+        -------
+            string or bytes
+        """
+        envelope = not self.codec.binary and has_bodies(message)
+        if envelope:
+            data = pack_envelope(message, self.codec)
+        else:
+            data = self.codec.dumps(message)
+
+        if (self.compress_threshold is not None
+                and len(data) >= self.compress_threshold):
+            return compress_envelope(data, envelope, self.codec,
+                                     self.compress_level)
+        return data
+
+    def decode(self, data):
+        """
+        Decodes a received message. Envelopes (see
+        utils.envelope.is_envelope) are unpacked.
+
+        Arguments
+        ---------
+            data: string or bytes
+
+        Returns
+        -------
+            python object
+        """
+        if is_envelope(data, self.codec):
+            return unpack_envelope(data, self.codec)
+        return self.codec.loads(data)
+
     def close(self):
         """
-        Closes all connections.
+        Closes all connections and shuts down the pools.
         """
 
         logging.debug("Got close call ... closing connection.")
         self.closed = True
+
+        for pool in self._executors.values():
+            pool.shutdown(wait=False)
+        self._executors.clear()
+
+        # the workers are joined by run_sharded, so the loop is not blocked
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+        if self.session is None:
+            return
+
+        # closing the session is a coroutine, so it is awaited on the loop
         try:
-            self.session.close()
+            loop = asyncio.get_event_loop()
+            if loop.is_running():
+                loop.create_task(self._close_session())
+            elif not loop.is_closed():
+                loop.run_until_complete(self._close_session())
         except Exception as err:  #pylint: disable=W0703
             logging.info('Error while closing websockets.\n%s', str(err))
 
-    @asyncio.coroutine
-    def run(self):
+    async def _close_session(self):
+        """
+        Closes the current session. A session is only closed once.
+        """
+        session = self._session
+        if session is None:
+            return
+        self._session = None
+        await session.close()
+
+    async def run(self):
         """
         Listens on the receiver socket and executes the incoming commands. If
         the command is not JSON encoded an Status.err(...) with the exception is
-        written to the other socket. Same for failed executions.
+        written to the other socket. Same for failed executions. A message
+        can hold a single command or a json array of commands (see
+        Command.to_json_batch).
         """
+        if self.workers is not None:
+            await self.run_sharded()
+            return
 
         logging.debug("Opened session on %s.", self.url)
-        self._session = yield from self.connection
+        self._session = await self.connection
+
+        async def call(method, arguments):
+            """
+            Calls the method with the arguments.
+            """
+            if method.is_async:
+                result = await method.call(**arguments)
+            elif method.execution != RpcMethod.EXECUTION_INLINE:
+                result = await asyncio.get_event_loop().run_in_executor(
+                    self.executor(method.execution),
+                    partial(method.call, **arguments))
+            else:
+                result = method.call(**arguments)
+                if asyncio.iscoroutine(result) or isinstance(
+                        result, asyncio.Future):
+                    result = await result
+            return result
+
+        async def call_memoized(method, arguments):
+            """
+            Returns the memoized result or calls the method. If a call with
+            the same arguments is running its result is awaited instead. If
+            that call is canceled, the method is called again. Calls whose
+            arguments have no cache key are not memoized.
+            """
+            key = method.cache_key(arguments)
+            if key is None:
+                return await call(method, arguments)
+
+            while True:
+                try:
+                    return method.results[key]
+                except KeyError:
+                    pass
 
-        @asyncio.coroutine
-        def execute_call(cmd):
+                running = method.calls.get(key)
+                if running is None:
+                    break
+
+                try:
+                    return await asyncio.shield(running)
+                except asyncio.CancelledError:
+                    if not running.cancelled():
+                        raise
+                    # the call which was awaited is canceled, not this one
+
+            future = asyncio.Future()
+            method.calls[key] = future
+            try:
+                result = await call(method, arguments)
+            except asyncio.CancelledError:
+                # CancelledError is an Exception before Python 3.8
+                future.cancel()
+                raise
+            except Exception as err:
+                future.set_exception(err)
+                future.exception()
+                raise
+            except BaseException:
+                future.cancel()
+                raise
+            finally:
+                del method.calls[key]
+
+            method.results[key] = result
+            future.set_result(result)
+            return result
+
+        async def stream(cmd, method):
+            """
+            Sends every chunk of a stream method as a partial Status and
+            returns the number of chunks.
+            """
+            chunks = method.call(**cmd.arguments)
+            count = 0
+
+            try:
+                async for chunk in chunks:
+                    sent = asyncio.Future()
+                    events.put_nowait((EVENT_PARTIAL,
+                                       Status(Status.ID_OK, {
+                                           'method': cmd.method,
+                                           'result': chunk,
+                                           'partial': True
+                                       }, cmd.uuid), sent))
+                    await sent
+                    count += 1
+            finally:
+                await chunks.aclose()
+
+            return count
+
+        async def execute_call(cmd):
             """
             Handles an incoming message in a seperat task
             """
-            callable_command = Rpc.get(cmd.method)
+            method = self.rpc.lookup(cmd.method)
             logging.debug("Found correct function ... calling.")
 
             try:
-                result = yield from asyncio.coroutine(callable_command)(
-                    **cmd.arguments)
+                if method.is_stream:
+                    result = await stream(cmd, method)
+                elif method.results is None:
+                    result = await call(method, cmd.arguments)
+                else:
+                    result = await call_memoized(method, cmd.arguments)
                 status_code = Status.ID_OK
-                logging.debug(
-                    'method %s with args: %s returned %s.',
-                    cmd.method,
-                    cmd.arguments,
-                    result,
-                )
-            except Exception as err:  # pylint: disable=W0703
+                if logging.root.isEnabledFor(logging.DEBUG):
+                    logging.debug(
+                        'method %s with args: %s returned %s.',
+                        cmd.method,
+                        Truncated(cmd.arguments, self.log_limit),
+                        Truncated(result, self.log_limit),
+                    )
+            except (Exception,  # pylint: disable=W0703
+                    asyncio.CancelledError) as err:
+                # CancelledError is no Exception since Python 3.8
                 result = str(err)
                 status_code = Status.ID_ERR
-                logging.info('Function raise Exception(%s)', result)
+                logging.info('Function raise Exception(%s)',
+                             Truncated(result, self.log_limit))
 
             return Status(status_code,
                           {'method': cmd.method,
                            'result': result}, cmd.uuid)
 
+        def method_limit(name):
+            """
+            Returns the in-flight limit of a registered method or None.
+            """
+            try:
+                return self.rpc.lookup(name).max_in_flight
+            except ProtocolError:
+                return None
+
+        loop = asyncio.get_event_loop()
+        events = asyncio.Queue()
+        tasks = dict()
+        counts = dict()
+        # queued commands by uuid in order of arrival and per method
+        pending = OrderedDict()
+        queues = dict()
+        canceled = set()
+
+        def is_full():
+            """
+            Checks if the global in-flight limit is reached.
+            """
+            return (self.max_in_flight is not None
+                    and len(tasks) >= self.max_in_flight)
+
+        def can_start(cmd):
+            """
+            Checks if the command can be executed without exceeding a limit.
+            """
+            if is_full():
+                return False
+            limit = method_limit(cmd.method)
+            return limit is None or counts.get(cmd.method, 0) < limit
+
+        def start(cmd):
+            """
+            Creates a task which executes the command. The finished task is
+            put into the event queue together with the command.
+            """
+            task = loop.create_task(execute_call(cmd))
+            task.add_done_callback(
+                lambda task: events.put_nowait((EVENT_FINISHED, cmd, task)))
+            tasks[cmd.uuid] = task
+            counts[cmd.method] = counts.get(cmd.method, 0) + 1
+
+        def enqueue(cmd):
+            """
+            Queues a command until it can be executed.
+            """
+            pending[cmd.uuid] = cmd
+            queues.setdefault(cmd.method, deque()).append(cmd)
+            logging.debug('Queued command %s.', cmd.method)
+
+        def method_head(name):
+            """
+            Returns the oldest queued command of a method or None. Commands
+            which left the queue are dropped from the method queue here.
+            """
+            queue = queues.get(name)
+            while queue and pending.get(queue[0].uuid) is not queue[0]:
+                queue.popleft()
+            if not queue:
+                queues.pop(name, None)
+                return None
+            return queue[0]
+
+        def wake(name):
+            """
+            Starts queued commands after a call of the method name finished.
+            Only the oldest command of this method and the oldest commands
+            of all methods are checked, so no event scans the whole queue.
+            """
+            cmd = method_head(name)
+            if cmd is not None and can_start(cmd):
+                del pending[cmd.uuid]
+                start(cmd)
+
+            while pending:
+                cmd = next(iter(pending.values()))
+                if not can_start(cmd):
+                    break
+                del pending[cmd.uuid]
+                start(cmd)
+
+        def receive():
+            """
+            Creates a task which reads the next message from the websocket.
+            """
+            task = loop.create_task(self.session.recv())
+            task.add_done_callback(
+                lambda task: events.put_nowait((EVENT_RECEIVED, None, task)))
+            return task
+
+        async def connect():
+            """
+            Tries to open a new session until it succeeds. Between two
+            attempts the delay grows exponentially and is randomized, so
+            clients which lost their connection at the same time do not
+            reconnect at the same time.
+            """
+            attempt = 0
+            while not self.closed:
+                delay = min(self.reconnect_max_delay,
+                            self.reconnect_delay * 2**attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+
+                try:
+                    self._connection = self.create_connection()
+                    return await self.connection
+                except (OSError,
+                        websockets.exceptions.InvalidHandshake) as err:
+                    logging.info('Reconnect to %s failed (%s).', self.url,
+                                 str(err))
+
+        def lost(err):
+            """
+            Drops the lost session and starts reconnecting if enabled.
+            Otherwise the error is raised.
+            """
+            if self.session is None and not self.closed:
+                return
+
+            if not self.reconnect or self.closed or _close_code(err) == 1000:
+                raise err
+
+            logging.warning('Lost connection to %s (%s) ... reconnecting.',
+                            self.url, str(err))
+            self._session = None
+            task = loop.create_task(connect())
+            task.add_done_callback(
+                lambda task: events.put_nowait((EVENT_CONNECTED, None, task)))
+
+        outbox = deque()
+        flusher = None
+        acks = dict()
+
+        def keep(status):
+            """
+            Adds the result to the outbox. If the outbox is full the oldest
+            result is dropped and a stream which waits for it is canceled.
+            """
+            if self.outbox_size is not None and len(
+                    outbox) >= self.outbox_size:
+                dropped = outbox.popleft()
+                logging.error('Outbox is full, dropped result of %s.',
+                              dropped.uuid)
+                ack = acks.pop(id(dropped), None)
+                if ack is not None:
+                    ack.cancel()
+            outbox.append(status)
+
+        async def transmit(data):
+            """
+            Sends a message. Returns False if the session was lost.
+            """
+            try:
+                await self.session.send(data)
+                return True
+            except websockets.exceptions.ConnectionClosed as err:
+                lost(err)
+                return False
+
+        async def flush():
+            """
+            Sends all results in the outbox. If batching is enabled the
+            results are send in messages with at most batch_size results.
+            Results which could not be send stay in the outbox.
+            """
+            nonlocal flusher
+            if flusher is not None:
+                flusher.cancel()
+                flusher = None
+
+            while outbox and self.session is not None:
+                if self.batch_size is None:
+                    chunk = [outbox[0]]
+                    data = self.encode(outbox[0].to_dict())
+                else:
+                    chunk = list(islice(outbox, self.batch_size))
+                    data = self.encode(
+                        [status.to_dict() for status in chunk])
+
+                if not await transmit(data):
+                    return
+
+                for _ in chunk:
+                    ack = acks.pop(id(outbox.popleft()), None)
+                    if ack is not None and not ack.done():
+                        ack.set_result(None)
+
+        async def send(status):
+            """
+            Sends the result directly or collects it if batching is enabled.
+            Without a session the result is kept until the reconnect.
+            """
+            nonlocal flusher
+            keep(status)
+
+            if self.session is None:
+                return
+
+            if self.batch_size is None or len(outbox) >= self.batch_size:
+                await flush()
+            elif flusher is None:
+                flusher = loop.call_later(self.batch_delay, events.put_nowait,
+                                          (EVENT_FLUSH, None, None))
+
+        async def cancel(uuid):
+            """
+            Cancels a running or queued command. Returns False if no such
+            command exists.
+            """
+            if uuid in tasks:
+                tasks[uuid].cancel()
+                canceled.add(uuid)
+                logging.debug('Canceled command %s.', uuid)
+            elif uuid in pending:
+                cmd = pending.pop(uuid)
+                logging.debug('Canceled pending command %s.', uuid)
+                await send(
+                    Status(Status.ID_ERR, {
+                        'method': cmd.method,
+                        'result': 'canceled before execution'
+                    }, uuid))
+            else:
+                return False
+            return True
+
+        async def handle(cmd):
+            """
+            Executes, queues or cancels a received command. Duplicates of
+            finished commands are answered from the result cache. Commands
+            with invalid arguments are rejected before a task is created.
+            """
+            if cmd.is_cancel():
+                if not await cancel(cmd.uuid):
+                    logging.debug('Nothing to cancel for %s.', cmd.uuid)
+                return
+
+            if cmd.uuid in tasks or cmd.uuid in pending:
+                if self.cancel_on_duplicate:
+                    await cancel(cmd.uuid)
+                else:
+                    logging.debug('Ignored duplicate command %s.', cmd.uuid)
+                return
+
+            if self._results is not None:
+                cached = self._results.get(cmd.uuid)
+                if cached is not None:
+                    logging.debug('Answered command %s from cache.', cmd.uuid)
+                    await send(cached)
+                    return
+
+            try:
+                self.rpc.lookup(cmd.method).validate(cmd.arguments)
+            except (ProtocolError, TypeError) as err:
+                logging.info('Rejected command %s (%s).', cmd.method, str(err))
+                await send(
+                    Status(Status.ID_ERR, {
+                        'method': cmd.method,
+                        'result': str(err)
+                    }, cmd.uuid))
+                return
+
+            if can_start(cmd):
+                start(cmd)
+                if logging.root.isEnabledFor(logging.DEBUG):
+                    logging.debug('Received command %s.',
+                                  Truncated(cmd, self.log_limit))
+            else:
+                enqueue(cmd)
+
+        def can_receive():
+            """
+            Checks if the next command can be read from the websocket.
+            """
+            if self.session is None:
+                return False
+            if pending or is_full():
+                return len(pending) < self.max_pending
+            return True
+
         try:
-            tasks = dict()
-            tasks['websocket'] = asyncio.get_event_loop().create_task(
-                self.session.recv())
+            receiver = receive()
 
             while not self.closed:
                 logging.debug("Listen on command channel.")
 
-                done, _ = yield from asyncio.wait(
-                    set(tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+                kind, item, future = await events.get()
+
+                if kind == EVENT_FLUSH:
+                    flusher = None
+                    await flush()
+
+                elif kind == EVENT_CONNECTED:
+                    self._session = future.result()
+                    logging.info('Reconnected to %s.', self.url)
+                    await flush()
+
+                elif kind == EVENT_PARTIAL:
+                    # the stream continues after the chunk was written
+                    acks[id(item)] = future
+                    keep(item)
+                    if self.session is not None:
+                        await flush()
+
+                elif kind == EVENT_FINISHED:
+                    if tasks.get(item.uuid) is future:
+                        del tasks[item.uuid]
+                    counts[item.method] -= 1
+                    wake(item.method)
+
+                    if future.cancelled():
+                        # canceled before the call started
+                        status = Status(Status.ID_ERR, {
+                            'method': item.method,
+                            'result': 'canceled'
+                        }, item.uuid)
+                    else:
+                        status = future.result()
+                    if item.uuid in canceled:
+                        # the status of a canceled call is no result
+                        canceled.discard(item.uuid)
+                    elif self._results is not None:
+                        self._results[item.uuid] = status
+                    await send(status)
+
+                elif future is receiver:
+                    receiver = None
+                    try:
+                        data = future.result()
+                    except websockets.exceptions.ConnectionClosed as err:
+                        lost(err)
+                        continue
+
+                    json_data = self.decode(data)
+                    if not isinstance(json_data, list):
+                        json_data = [json_data]
+
+                    # an invalid entry does not stop the rest of a batch
+                    for entry in json_data:
+                        try:
+                            cmd = Command.from_dict(entry)
+                        except ProtocolError as err:
+                            logging.info('Rejected invalid command (%s).',
+                                         str(err))
+                            await send(_invalid_command(entry, err))
+                            continue
+                        await handle(cmd)
+
+                else:
+                    # receiver of a lost session
+                    future.exception()
+
+                if receiver is None and can_receive():
+                    receiver = receive()
+
+        except websockets.exceptions.ConnectionClosed as err:
+            logging.error('failed to send/receive message \n%s', str(err))
+            if _close_code(err) != 1000:
+                raise err
+        finally:
+            logging.debug("Closing connections.")
+            for ack in acks.values():
+                ack.cancel()
+            acks.clear()
+            await self._close_session()
+
+    def shard(self, uuid):
+        """
+        Returns the index of the worker which executes the command with the
+        given uuid. The uuid is hashed, so consecutive uuids (see
+        utils.ids) are spread over the workers.
+
+        Arguments
+        ---------
+            uuid: string
+
+        Returns
+        -------
+            int
+        """
+        digest = _shard_hash(uuid.encode()).digest()
+        return int.from_bytes(digest[:8], 'big') % self.workers
+
+    async def run_sharded(self):
+        """
+        Starts the worker processes and forwards the received commands to
+        them. Their results are send over the websocket.
+        """
+        loop = asyncio.get_event_loop()
+        events = asyncio.Queue()
+        pipes = []
+
+        for _ in range(self.workers):
+            pipe, worker_pipe = multiprocessing.Pipe()
+            process = self._worker_context.Process(
+                target=_run_worker,
+                args=(worker_pipe, self.rpc.name, self._worker_modules,
+                      self._worker_options))
+            process.start()
+            worker_pipe.close()
+            self._processes.append(process)
+            pipes.append(pipe)
+
+        def forward(index, message):
+            """
+            Puts a message of a worker into the event queue.
+            """
+            events.put_nowait((index, message))
+
+        for index, pipe in enumerate(pipes):
+            threading.Thread(
+                target=_read_pipe,
+                args=(pipe, loop, partial(forward, index)),
+                daemon=True).start()
+
+        logging.debug("Started %d workers.", self.workers)
+        logging.debug("Opened session on %s.", self.url)
+        self._session = await self.connection
+
+        def receive():
+            """
+            Creates a task which reads the next message from the websocket.
+            """
+            task = loop.create_task(self.session.recv())
+            task.add_done_callback(partial(forward, None))
+
+        try:
+            receive()
+
+            while not self.closed:
+                source, item = await events.get()
+
+                if source is None:
+                    json_data = self.decode(item.result())
+                    if not isinstance(json_data, list):
+                        json_data = [json_data]
 
-                tasks = dict(
-                    (k, v) for (k, v) in tasks.items() if not v.done())
+                    for entry in json_data:
+                        try:
+                            cmd = Command.from_dict(entry)
+                        except ProtocolError as err:
+                            logging.info('Rejected invalid command (%s).',
+                                         str(err))
+                            await self.session.send(
+                                self.encode(
+                                    _invalid_command(entry, err).to_dict()))
+                            continue
+                        await loop.run_in_executor(
+                            None, pipes[self.shard(cmd.uuid)].send,
+                            _copy_views(cmd.to_dict()))
 
-                for future in done:
-                    data = future.result()
-                    logging.debug('Future type: %s', type(future.result()))
+                    receive()
 
-                    if isinstance(data, str):
-                        cmd = Command.from_json(data)
+                elif item is None:
+                    if self.closed:
+                        break
+                    raise RuntimeError("Worker {} stopped.".format(source))
 
-                        if cmd.uuid in tasks:
-                            tasks[cmd.uuid].cancel()
-                            logging.debug('Canceled command %s.', cmd.method)
-                        else:
-                            tasks[cmd.uuid] = asyncio.get_event_loop(
-                            ).create_task(execute_call(cmd))
-                            logging.debug('Received command %s.',
-                                          cmd.to_json())
-                        tasks['websocket'] = asyncio.get_event_loop(
-                        ).create_task(self.session.recv())
-                    if isinstance(data, Status):
-                        yield from self.session.send(data.to_json())
+                else:
+                    await self.session.send(self.encode(item))
 
         except websockets.exceptions.ConnectionClosed as err:
             logging.error('failed to send/receive message \n%s', str(err))
-            if err.code != 1000:
+            if _close_code(err) != 1000:
                 raise err
         finally:
             logging.debug("Closing connections.")
-            yield from self.session.close()
+            for pipe in pipes:
+                pipe.close()
+            await loop.run_in_executor(None, self._join_workers)
+            await self._close_session()
+
+    def _join_workers(self):
+        """
+        Waits until the workers exited after their pipes were closed. Workers
+        which do not exit within a second are terminated.
+        """
+        processes = self._processes
+        self._processes = []
+
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+
+
+class _WorkerReceiver(RpcReceiver):
+    """
+    Represents the receiver of a worker process of a sharded receiver. The
+    commands are received from the front process through a pipe and the
+    results are send back the same way.
+
+    Arguments
+    ---------
+        pipe: multiprocessing.connection.Connection to the front process
+        **kwargs: arguments of RpcReceiver
+    """
+
+    def __init__(self, pipe, **kwargs):
+        self._pipe = pipe
+        super().__init__(None, codec=_ObjectCodec(), **kwargs)
+
+    def create_connection(self):
+        return self._open_pipe()
+
+    async def _open_pipe(self):
+        """
+        Returns the session of the pipe.
+        """
+        return _PipeSession(self._pipe, asyncio.get_event_loop())
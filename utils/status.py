@@ -3,10 +3,11 @@ This module contains a status which
 can be encoded into a json string.
 """
 
-from uuid import uuid4
-
 import json
 
+from .ids import new_id
+from .typecheck import compile_schema
+
 __all__ = ["FormatError", "Status"]
 
 
@@ -31,11 +32,27 @@ class Status:
     ID_PAYLOAD = "payload"
     ID_UUID = "uuid"
 
+    FIELDS = (ID_STATUS, ID_PAYLOAD, ID_UUID)
+    """
+    Holds the keys of the encoded status.
+    """
+
+    VALIDATOR = compile_schema({
+        ID_STATUS: str,
+        ID_PAYLOAD: object,
+        ID_UUID: str
+    }, "status")
+    """
+    Checks the structure of a decoded status (see compile_schema).
+    """
+
+    __slots__ = ("__status", "__payload", "__uuid")
+
     def __repr__(self):
         return str(self)
 
     def __str__(self):
-        return str(dict(self))
+        return str(self.to_dict())
 
     def __init__(self, status, payload, uuid=None):
         if status != Status.ID_OK and status != Status.ID_ERR:
@@ -46,7 +63,7 @@ class Status:
             self.__status = status
             self.__payload = payload
             if uuid is None:
-                self.__uuid = uuid4().hex
+                self.__uuid = new_id()
             else:
                 self.__uuid = uuid
 
@@ -54,9 +71,7 @@ class Status:
         return self.status == other.status and self.payload == other.payload
 
     def __iter__(self):
-        for key, val in vars(Status).items():
-            if isinstance(val, property):
-                yield (key, self.__getattribute__(key))
+        return iter(self.to_dict().items())
 
     @property
     def status(self):
@@ -125,7 +140,7 @@ class Status:
         return self.status == Status.ID_OK
 
     @classmethod
-    def ok(cls, payload):  #pylint: disable=C0103
+    def ok(cls, payload, uuid=None):  #pylint: disable=C0103
         """
         Creates an instance of this class with a payload and a successful status
         string. DO NOT use json.dumps(...) as a payload unless you want the
@@ -134,11 +149,12 @@ class Status:
         Arguments
         ---------
             payload: Any kind of serializable value.
+            uuid: identifier (default: a new identifier)
         """
-        return cls(cls.ID_OK, payload)
+        return cls(cls.ID_OK, payload, uuid)
 
     @classmethod
-    def err(cls, payload):
+    def err(cls, payload, uuid=None):
         """
         Creates an instance of this class with a payload and a unsuccessful
         status string. DO NOT use json.dumps(...) as a payload unless you want
@@ -148,8 +164,23 @@ class Status:
         Arguments
         ---------
             payload: Any kind of serializable value.
+            uuid: identifier (default: a new identifier)
+        """
+        return cls(cls.ID_ERR, payload, uuid)
+
+    def to_dict(self):
+        """
+        Generates a dictionary which can be encoded.
+
+        Returns
+        -------
+            A dictionary with the keys in FIELDS.
         """
-        return cls(cls.ID_ERR, payload)
+        return {
+            self.ID_STATUS: self.__status,
+            self.ID_PAYLOAD: self.__payload,
+            self.ID_UUID: self.__uuid,
+        }
 
     def to_json(self):
         """
@@ -163,10 +194,10 @@ class Status:
             If message and result is set at the same time
             an error will be raised as well.
         """
-        return json.dumps(dict(self))
+        return json.dumps(self.to_dict())
 
     @classmethod
-    def from_json(cls, data):
+    def from_json(cls, data, schema=None):
         """
         Tries to parse a json object from a json encoded string.
         The resulting json object is mapped to Status.
@@ -174,6 +205,7 @@ class Status:
         Attributes
         ----------
             data: a string which is json encoded
+            schema: compiled schema for the payload (see compile_schema)
 
         Returns
         -------
@@ -183,25 +215,78 @@ class Status:
         ------
             ProtocolError when a key is not found.
         """
-        json_data = json.loads(data)
+        return cls.from_dict(json.loads(data), schema)
+
+    @classmethod
+    def from_dict(cls, json_data, schema=None):
+        """
+        Maps a decoded json object to Status.
 
+        Attributes
+        ----------
+            json_data: a dictionary
+            schema: compiled schema for the payload (see compile_schema)
+
+        Returns
+        -------
+            A valid Status
+
+        Except
+        ------
+            FormatError when a key is not found or an entry has a wrong type.
+        """
         try:
-            status = json_data[cls.ID_STATUS]
-
-            if status == cls.ID_OK:
-                obj = cls.ok(json_data[cls.ID_PAYLOAD])
-                obj.uuid = json_data[cls.ID_UUID]
-                return obj
-            elif status == cls.ID_ERR:
-                obj = cls.err(json_data[cls.ID_PAYLOAD])
-                obj.uuid = json_data[cls.ID_UUID]
-                return obj
-            else:
-                raise FormatError("Missing status field in Status.")
+            cls.VALIDATOR(json_data)
+            if schema is not None:
+                schema(json_data[cls.ID_PAYLOAD])
+        except TypeError as err:
+            raise FormatError(str(err))
+
+        status = json_data[cls.ID_STATUS]
+
+        if status != cls.ID_OK and status != cls.ID_ERR:
+            raise FormatError("Missing status field in Status.")
+
+        return cls(status, json_data[cls.ID_PAYLOAD], json_data[cls.ID_UUID])
+
+    @staticmethod
+    def to_json_batch(statuses):
+        """
+        Generates a string which holds multiple statuses as a json array.
+
+        Arguments
+        ---------
+            statuses: iterable of Status
+
+        Returns
+        -------
+            A json string.
+        """
+        return json.dumps([status.to_dict() for status in statuses])
+
+    @classmethod
+    def from_json_batch(cls, data):
+        """
+        Tries to parse a json array of statuses from a json encoded string.
+
+        Attributes
+        ----------
+            data: a string which is json encoded
+
+        Returns
+        -------
+            A list of valid Status
+
+        Except
+        ------
+            FormatError when the data is not an array or a status is invalid.
+        """
+        json_data = json.loads(data)
+
+        if not isinstance(json_data, list):
+            raise FormatError("A batch has to be a json array.")
 
-        except KeyError as err:
-            raise FormatError("Missing field in encode string. ({})".format(
-                err.args[0]))
+        return [cls.from_dict(entry) for entry in json_data]
 
     @staticmethod
     def as_js():
@@ -2,16 +2,17 @@
 This module contains function to check the type of variables.
 """
 
+from array import ArrayType
+from collections.abc import Iterator
 
-def ensure_type(name, var, *types):
+
+def _ensure_types(types):
     """
-    Checks if a variable with a name has one of the allowed types.
+    Checks if all entries are types.
 
     Arguments
     ---------
-        name: variable name
-        var: python object
-        *types: allowed types
+        types: tuple of allowed types
     """
     for ty in types:
         if not isinstance(ty, type):
@@ -19,52 +20,380 @@ def ensure_type(name, var, *types):
                 "The given value {} in *types is not a type. (found {})".
                 format(ty, type(ty).__name__))
 
-        if isinstance(var, ty):
+
+def _type_names(types):
+    """
+    Returns the names of the types for error messages.
+
+    Arguments
+    ---------
+        types: tuple of types
+
+    Returns
+    -------
+        string
+    """
+    return ' or '.join(ty.__name__ for ty in types)
+
+
+def ensure_type(name, var, *types):
+    """
+    Checks if a variable with a name has one of the allowed types.
+
+    Arguments
+    ---------
+        name: variable name
+        var: python object
+        *types: allowed types
+    """
+    try:
+        if isinstance(var, types):
             return
+    except TypeError:
+        pass
+
+    _ensure_types(types)
 
     raise TypeError("{} has to be {}. (found {})".format(
         name,
-        ' or'.join(map(lambda x: x.__name__, types)),
+        _type_names(types),
         type(var).__name__,
     ))
 
 
-def ensure_type_array(name, array, *types):
+def type_checker(name, *types):
     """
-    Checks if one type holds for all array elements.
+    Creates a function which checks if a variable has one of the allowed
+    types. The types are validated once, so the returned function only does
+    a single isinstance check if the type is correct.
+
+    Arguments
+    ---------
+        name: variable name
+        *types: allowed types
+
+    Returns
+    -------
+        A function which takes a python object and raises a TypeError if it
+        has none of the allowed types.
+    """
+    _ensure_types(types)
+    message = "{} has to be {}. (found {{}})".format(name, _type_names(types))
+
+    def check(var):
+        """
+        Checks the type of var.
+        """
+        if not isinstance(var, types):
+            raise TypeError(message.format(type(var).__name__))
+
+    return check
+
+
+def _buffer_element_type(array):
+    """
+    Returns the type of the elements of a typed buffer without looking at the
+    elements. Supported are bytes, bytearray, array.array, one dimensional
+    memoryview objects and one dimensional numpy arrays.
+
+    Arguments
+    ---------
+        array: python object
+
+    Returns
+    -------
+        type or None if the object is no supported buffer
+    """
+    if isinstance(array, (bytes, bytearray)):
+        return int
+
+    if isinstance(array, ArrayType):
+        return _TYPECODES.get(array.typecode)
+
+    if isinstance(array, memoryview):
+        if array.ndim != 1:
+            return None
+        return _TYPECODES.get(array.format.lstrip('@=<>!'))
+
+    if type(array).__module__ == 'numpy' and getattr(array, 'ndim', 0) == 1:
+        dtype = getattr(array, 'dtype', None)
+        if dtype is not None:
+            return _DTYPE_KINDS.get(dtype.kind)
+
+    return None
+
+
+_TYPECODES = dict(
+    [(code, int) for code in 'bBhHiIlLqQnN'] +
+    [(code, float) for code in 'efd'] +
+    [('?', bool), ('c', bytes), ('u', str), ('w', str)])
+"""
+Maps the typecodes of array.array and the formats of memoryview to the type
+of their elements.
+"""
+
+_DTYPE_KINDS = {
+    'i': int,
+    'u': int,
+    'f': float,
+    'b': bool,
+    'U': str,
+    'S': bytes,
+}
+"""
+Maps the kinds of numpy dtypes to the type of their elements. The scalar
+types of numpy (numpy.int64, numpy.bool_, ...) are no subclasses of these
+types, so the kind is used instead of dtype.type.
+"""
+
+
+def ensure_type_array(name, array, *types, max_errors=10):
+    """
+    Checks if one type holds for all array elements. Typed buffers (see
+    _buffer_element_type) are checked by their element type. Other arrays
+    are checked by the set of their element types, so the elements are only
+    looked at one by one if an error is reported.
 
     Arguments
     ---------
         name: variable name
         var: array with python objects
         *types: allowed types
+        max_errors: maximal number of elements which are listed in the error
+            message
     """
-    for ty in types:
-        if not isinstance(ty, type):
-            raise ValueError(
-                "The given value {} in *types is not a type. (found {})".
-                format(ty, type(ty).__name__))
+    _ensure_types(types)
+
+    element_type = _buffer_element_type(array)
+
+    if element_type is not None:
+        if issubclass(element_type, types):
+            return
+    else:
+        if isinstance(array, Iterator):
+            array = list(array)
+
+        if all(issubclass(ty, types) for ty in set(map(type, array))):
+            return
 
     errors = []
+    count = 0
 
     for idx, var in enumerate(array):
-        skip = False
-        for ty in types:
-            if isinstance(var, ty):
-                skip = True
-                break
-        if skip:
-            continue
-        else:
-            errors.append((idx, type(var)))
+        if not isinstance(var, types):
+            count += 1
+            if len(errors) < max_errors:
+                errors.append((idx, type(var)))
 
     if errors:
+        lines = [
+            "\telement with index {} has type {}".format(idx, ty.__name__)
+            for (idx, ty) in errors
+        ]
+        if count > len(errors):
+            lines.append("\tand {} more elements".format(count - len(errors)))
+
         raise TypeError(
             "All elements in {} has to be {}. This does not hold for the elements:\n{}".
             format(
                 name,
-                ' or'.join(map(lambda x: x.__name__, types)),
-                '\n'.join(
-                    map(lambda e: "\telement with index " + str(e[0]) + " has type " + str(e[1].__name__),
-                        errors)),
+                _type_names(types),
+                '\n'.join(lines),
             ))
+
+
+class Optional:
+    """
+    Marks a schema as optional. In a dictionary schema the key may be
+    missing, everywhere the value may be None.
+
+    Arguments
+    ---------
+        schema: schema of the value (see compile_schema)
+    """
+
+    __slots__ = ("schema", )
+
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class Union:
+    """
+    Represents a schema which matches if one of the given schemas matches.
+
+    Arguments
+    ---------
+        *schemas: schemas (see compile_schema)
+    """
+
+    __slots__ = ("schemas", )
+
+    def __init__(self, *schemas):
+        self.schemas = schemas
+
+
+class _Mismatch(Exception):
+    """
+    A value does not match a schema. The path to the value is collected
+    while the exception passes through the nested validators.
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+        self.path = []
+
+
+def _found(expected, value):
+    """
+    Returns a mismatch for a value with a wrong type.
+    """
+    return _Mismatch("has to be {}. (found {})".format(
+        expected, type(value).__name__))
+
+
+def _describe(schema):
+    """
+    Returns a short description of a schema for error messages.
+    """
+    if isinstance(schema, type):
+        return schema.__name__
+    if isinstance(schema, tuple):
+        return _type_names(schema)
+    if isinstance(schema, Union):
+        return ' or '.join(_describe(sub) for sub in schema.schemas)
+    if isinstance(schema, Optional):
+        return _describe(schema.schema) + ' or None'
+    if isinstance(schema, dict):
+        return 'dict'
+    if isinstance(schema, list):
+        return 'list'
+    return repr(schema)
+
+
+def _compile(schema):
+    """
+    Builds the validator for one level of a schema. The validator raises
+    _Mismatch if the value does not match.
+    """
+    if isinstance(schema, type) or isinstance(schema, tuple):
+        if isinstance(schema, tuple):
+            _ensure_types(schema)
+        expected = _describe(schema)
+
+        def check_type(value):
+            if not isinstance(value, schema):
+                raise _found(expected, value)
+
+        return check_type
+
+    if isinstance(schema, Optional):
+        inner = _compile(schema.schema)
+
+        def check_optional(value):
+            if value is not None:
+                inner(value)
+
+        return check_optional
+
+    if isinstance(schema, Union):
+        inners = [_compile(sub) for sub in schema.schemas]
+        expected = _describe(schema)
+
+        def check_union(value):
+            for inner in inners:
+                try:
+                    inner(value)
+                    return
+                except _Mismatch:
+                    pass
+            raise _found(expected, value)
+
+        return check_union
+
+    if isinstance(schema, list):
+        if len(schema) != 1:
+            raise ValueError("A list schema has to hold exactly one schema.")
+        inner = _compile(schema[0])
+
+        def check_list(value):
+            if not isinstance(value, (list, tuple)):
+                raise _found('list', value)
+            for idx, item in enumerate(value):
+                try:
+                    inner(item)
+                except _Mismatch as err:
+                    err.path.append('[{}]'.format(idx))
+                    raise
+
+        return check_list
+
+    if isinstance(schema, dict):
+        fields = [(key, _compile(sub), isinstance(sub, Optional))
+                  for (key, sub) in schema.items()]
+
+        def check_dict(value):
+            if not isinstance(value, dict):
+                raise _found('dict', value)
+            for key, inner, optional in fields:
+                try:
+                    item = value[key]
+                except KeyError:
+                    if optional:
+                        continue
+                    raise _Mismatch("is missing the key {!r}.".format(key))
+                try:
+                    inner(item)
+                except _Mismatch as err:
+                    err.path.append('[{!r}]'.format(key))
+                    raise
+
+        return check_dict
+
+    raise ValueError("The given value {} is not a schema. (found {})".format(
+        schema,
+        type(schema).__name__))
+
+
+def compile_schema(schema, name="value"):
+    """
+    Creates a function which checks if a value matches a schema. The schema
+    is compiled once, so checking a value does not interpret the schema.
+
+    A schema is one of
+        type or tuple of types: the value has to be an instance
+        [schema]: the value is a list whose elements match the schema
+        {key: schema}: the value is a dictionary which holds all keys whose
+            values match the schemas. Other keys are allowed.
+        Optional(schema): the value is None or matches the schema. In a
+            dictionary schema the key may be missing.
+        Union(*schemas): the value matches one of the schemas
+
+    Arguments
+    ---------
+        schema: the schema
+        name: variable name for error messages
+
+    Returns
+    -------
+        A function which takes a value and raises a TypeError if the value
+        does not match the schema.
+
+    Except
+    ------
+        ValueError if the schema is invalid
+    """
+    validate = _compile(schema)
+
+    def check(value):
+        """
+        Checks if value matches the schema.
+        """
+        try:
+            validate(value)
+        except _Mismatch as err:
+            raise TypeError("{}{} {}".format(
+                name, ''.join(reversed(err.path)), err.message)) from None
+
+    return check